@@ -1,17 +1,33 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, make_response, send_file
 from flask_cors import CORS
+from functools import wraps
 import os
 import tempfile
 from werkzeug.utils import secure_filename
 import json
+import time
 from datetime import datetime
 import uuid
-import requests
+import hashlib
+import hmac
+import bisect
+import tracemalloc
+import threading
 
 # Import our custom modules
-from parser.extract_text import extract_text_from_file
-from models.skill_matcher import SkillMatcher
-from models.scoring import ResumeScorer
+from parser.extract_text import (extract_text_from_file, get_file_info, split_sections, normalize_text,
+                                 fold_text, ExtractionLimitExceeded, ExtractionMemoryExceeded, FOLD_VERSION)
+from models.skill_matcher import SkillMatcher, SKILLS_ARTIFACT_PATH
+from models.scoring import ResumeScorer, FEATURES_DIGEST
+from models.nlp import get_nlp
+from models.jd_matcher import JobDescriptionRegistry
+from services.admission import AdmissionController, AdmissionRejected
+from services.dedup import MinHashIndex
+from services.analysis_store import AnalysisStore
+from services.profiling import RequestProfiler
+from services.memory import StageMeter, current_rss
+from services.section_cache import SectionCache
+from services.ocr import OcrService, OcrError
 
 app = Flask(__name__)
 CORS(app)
@@ -21,21 +37,236 @@ app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
 app.config['UPLOAD_FOLDER'] = 'resume_storage'
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx'}
 
+# Grammar check service; point this at a local LanguageTool server or stub
+app.config['LANGUAGETOOL_URL'] = os.environ.get('LANGUAGETOOL_URL', 'https://api.languagetool.org/v2/check')
+app.config['LANGUAGETOOL_LANGUAGE'] = os.environ.get('LANGUAGETOOL_LANGUAGE', 'en-US')
+
+# Admission control: expensive analysis and cheap lookups get separate lanes
+app.config['ANALYSIS_MAX_CONCURRENCY'] = int(os.environ.get('ANALYSIS_MAX_CONCURRENCY', 2))
+app.config['ANALYSIS_MAX_QUEUE'] = int(os.environ.get('ANALYSIS_MAX_QUEUE', 8))
+app.config['ANALYSIS_QUEUE_TIMEOUT'] = float(os.environ.get('ANALYSIS_QUEUE_TIMEOUT', 30))
+app.config['LIGHT_MAX_CONCURRENCY'] = int(os.environ.get('LIGHT_MAX_CONCURRENCY', 32))
+app.config['LIGHT_MAX_QUEUE'] = int(os.environ.get('LIGHT_MAX_QUEUE', 64))
+app.config['LIGHT_QUEUE_TIMEOUT'] = float(os.environ.get('LIGHT_QUEUE_TIMEOUT', 5))
+
+admission = AdmissionController()
+admission.add_lane('analysis', app.config['ANALYSIS_MAX_CONCURRENCY'],
+                   app.config['ANALYSIS_MAX_QUEUE'], app.config['ANALYSIS_QUEUE_TIMEOUT'])
+admission.add_lane('light', app.config['LIGHT_MAX_CONCURRENCY'],
+                   app.config['LIGHT_MAX_QUEUE'], app.config['LIGHT_QUEUE_TIMEOUT'])
+
+# Preflight limits, checked from document metadata before full extraction
+app.config['PREFLIGHT_MAX_PAGES'] = int(os.environ.get('PREFLIGHT_MAX_PAGES', 10))
+app.config['PREFLIGHT_MIN_TEXT_CHARS'] = int(os.environ.get('PREFLIGHT_MIN_TEXT_CHARS', 50))
+
+# Optional OCR for scanned PDFs (needs a local Tesseract install). It runs on its
+# own process pool, and scanned uploads queue in the 'ocr' admission lane instead of
+# 'analysis', so OCR cannot crowd out normal extraction.
+app.config['OCR_ENABLED'] = os.environ.get('OCR_ENABLED', 'false').lower() == 'true'
+app.config['OCR_MAX_WORKERS'] = int(os.environ.get('OCR_MAX_WORKERS', 1))
+app.config['OCR_MAX_CONCURRENCY'] = int(os.environ.get('OCR_MAX_CONCURRENCY', 1))
+app.config['OCR_MAX_QUEUE'] = int(os.environ.get('OCR_MAX_QUEUE', 2))
+app.config['OCR_QUEUE_TIMEOUT'] = float(os.environ.get('OCR_QUEUE_TIMEOUT', 30))
+app.config['OCR_TIME_BUDGET'] = float(os.environ.get('OCR_TIME_BUDGET', 60))
+app.config['OCR_LANGUAGE'] = os.environ.get('OCR_LANGUAGE', 'eng')
+app.config['OCR_DPI'] = int(os.environ.get('OCR_DPI', 300))
+app.config['OCR_CACHE_DIR'] = os.path.join(app.config['UPLOAD_FOLDER'], 'ocr')
+if app.config['OCR_ENABLED']:
+    admission.add_lane('ocr', app.config['OCR_MAX_CONCURRENCY'],
+                       app.config['OCR_MAX_QUEUE'], app.config['OCR_QUEUE_TIMEOUT'])
+
+# Extraction ceilings: abort cleanly instead of letting one document get the worker OOM-killed
+app.config['EXTRACTION_MAX_CHARS'] = int(os.environ.get('EXTRACTION_MAX_CHARS', 200000))
+app.config['EXTRACTION_MAX_RSS_MB'] = int(os.environ.get('EXTRACTION_MAX_RSS_MB', 1024))
+# Per-stage tracemalloc peaks in pipeline_stats (adds allocation-tracing overhead)
+app.config['PIPELINE_TRACEMALLOC'] = os.environ.get('PIPELINE_TRACEMALLOC', 'false').lower() == 'true'
+if app.config['PIPELINE_TRACEMALLOC']:
+    tracemalloc.start()
+
+# Incremental re-analysis: skills, scoring features and grammar findings are
+# cached per resume section in a SQLite file shared by all workers, so edited
+# re-uploads only re-run changed sections whichever worker serves them
+app.config['INCREMENTAL_ANALYSIS'] = os.environ.get('INCREMENTAL_ANALYSIS', 'true').lower() == 'true'
+app.config['SECTION_CACHE_SIZE'] = int(os.environ.get('SECTION_CACHE_SIZE', 20000))
+app.config['SECTION_CACHE_PATH'] = os.path.join(app.config['UPLOAD_FOLDER'], 'sections.db')
+
+# Near-duplicate detection: uploads at least DEDUP_THRESHOLD similar to an analyzed resume reuse its analysis
+app.config['DEDUP_ENABLED'] = os.environ.get('DEDUP_ENABLED', 'true').lower() == 'true'
+app.config['DEDUP_THRESHOLD'] = float(os.environ.get('DEDUP_THRESHOLD', 0.9))
+app.config['DEDUP_INDEX_PATH'] = os.path.join(app.config['UPLOAD_FOLDER'], 'minhash_index.db')
+
+# Registered job descriptions for one-CV-against-many-JDs matching
+app.config['JD_REGISTRY_PATH'] = os.path.join(app.config['UPLOAD_FOLDER'], 'job_descriptions.jsonl')
+
+# Persistent analysis store for /api/analysis/<file_id>
+app.config['ANALYSIS_STORE_PATH'] = os.path.join(app.config['UPLOAD_FOLDER'], 'analyses.db')
+app.config['ANALYSIS_TTL_DAYS'] = float(os.environ.get('ANALYSIS_TTL_DAYS', 30))
+app.config['ANALYSIS_STORE_MAX_MB'] = int(os.environ.get('ANALYSIS_STORE_MAX_MB', 512))
+
+# Profiling: admins can profile a request on demand (X-Profile: 1 or ?profile=1
+# with X-Admin-Token), and PROFILE_SAMPLE_RATE profiles a share of all traffic
+app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN', '')
+app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+app.config['PROFILE_DIR'] = os.path.join(app.config['UPLOAD_FOLDER'], 'profiles')
+
+# Compiled skills catalog shared by all workers through mmap; see models/skills_artifact.py
+app.config['SKILLS_ARTIFACT_PATH'] = os.environ.get('SKILLS_ARTIFACT_PATH', SKILLS_ARTIFACT_PATH)
+
 # Initialize our analysis modules
-skill_matcher = SkillMatcher()
+skill_matcher = SkillMatcher(app.config['SKILLS_ARTIFACT_PATH'])
 resume_scorer = ResumeScorer()
+ocr_service = OcrService(app.config['OCR_CACHE_DIR'], max_workers=app.config['OCR_MAX_WORKERS'],
+                         time_budget=app.config['OCR_TIME_BUDGET'], language=app.config['OCR_LANGUAGE'],
+                         dpi=app.config['OCR_DPI']) if app.config['OCR_ENABLED'] else None
+dedup_index = MinHashIndex(app.config['DEDUP_INDEX_PATH'], threshold=app.config['DEDUP_THRESHOLD'],
+                           ttl_seconds=app.config['ANALYSIS_TTL_DAYS'] * 24 * 3600) \
+    if app.config['DEDUP_ENABLED'] else None
+section_cache = SectionCache(app.config['SECTION_CACHE_PATH'], app.config['SECTION_CACHE_SIZE']) if app.config['INCREMENTAL_ANALYSIS'] else None
+profiler = RequestProfiler(app.config['PROFILE_DIR'], sample_rate=app.config['PROFILE_SAMPLE_RATE'])
+jd_registry = JobDescriptionRegistry(skill_matcher.get_all_skills(), app.config['JD_REGISTRY_PATH'])
+analysis_store = AnalysisStore(app.config['ANALYSIS_STORE_PATH'],
+                               ttl_seconds=app.config['ANALYSIS_TTL_DAYS'] * 24 * 3600,
+                               max_bytes=app.config['ANALYSIS_STORE_MAX_MB'] * 1024 * 1024)
+
+def warm_up():
+    """
+    Import the document parsers and load the spaCy model ahead of the first
+    request. Runs at import time when WARM_UP_ON_START is set, or can be called
+    explicitly by a server entry point.
+    """
+    import fitz  # noqa: F401
+    import pdfplumber  # noqa: F401
+    import docx  # noqa: F401
+    import requests  # noqa: F401
+    from dateutil import parser  # noqa: F401
+    try:
+        get_nlp()
+    except Exception as e:
+        print(f"Could not load spaCy model during warm-up: {str(e)}")
+
+app.config['WARM_UP_ON_START'] = os.environ.get('WARM_UP_ON_START', 'false').lower() == 'true'
+if app.config['WARM_UP_ON_START']:
+    warm_up()
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def check_writing_quality(text):
-    url = "https://api.languagetool.org/v2/check"
-    data = {"text": text, "language": "en-US"}
+def busy_response(retry_after):
+    response = jsonify({'error': 'Server is busy analyzing other resumes. Please retry shortly.'})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def admission_lane(lane_name):
+    """Run the view inside a slot of the given admission lane, answering 429 when saturated"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                with admission.lane(lane_name).slot():
+                    return view(*args, **kwargs)
+            except AdmissionRejected as e:
+                return busy_response(e.retry_after)
+        return wrapper
+    return decorator
+
+def publish_skills_snapshot(snapshot):
+    """Rebuild the JD registry for a newly swapped-in skills catalog"""
+    global jd_registry
+    # Build the new registry before publishing it; readers keep whichever one they already hold
+    jd_registry = JobDescriptionRegistry(snapshot.all_skills, app.config['JD_REGISTRY_PATH'])
+    print(f"Skills catalog reloaded: version {snapshot.digest[:12]}, {len(snapshot.all_skills)} skills")
+
+@app.before_request
+def refresh_skills_catalog():
+    """Pick up a catalog that another worker persisted through /api/skills/reload"""
+    try:
+        snapshot = skill_matcher.refresh()
+    except ValueError as e:
+        print(f"Ignoring invalid skills catalog on disk: {str(e)}")
+        return
+    if snapshot is not None:
+        publish_skills_snapshot(snapshot)
+
+def is_admin_request():
+    token = app.config['ADMIN_TOKEN']
+    return bool(token) and hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token)
+
+def profiled(view):
+    """
+    Run the view under the profiler when an admin asks for it or the request
+    is sampled. On-demand profiles are summarized in the JSON response.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        requested = request.headers.get('X-Profile') == '1' or request.args.get('profile') == '1'
+        if requested and not is_admin_request():
+            return jsonify({'error': 'Profiling requires a valid admin token'}), 403
+        if not requested and not profiler.should_sample():
+            return view(*args, **kwargs)
+
+        with profiler.profile() as run:
+            response = make_response(view(*args, **kwargs))
+        if run.profile_id is None or not requested:
+            return response
+
+        response.headers['X-Profile-Id'] = run.profile_id
+        if response.is_json:
+            data = response.get_json()
+            data['profile'] = {'profile_id': run.profile_id, 'hot_functions': run.hot_functions}
+            response.set_data(json.dumps(data))
+        return response
+    return wrapper
+
+def languagetool_matches(text):
+    import requests
+
+    url = app.config['LANGUAGETOOL_URL']
+    data = {"text": text, "language": app.config['LANGUAGETOOL_LANGUAGE']}
+    response = requests.post(url, data=data, timeout=10)
+    # Failed checks must raise rather than read as "no findings", or they would be cached per section
+    response.raise_for_status()
+    payload = response.json()
+    if not isinstance(payload, dict) or not isinstance(payload.get("matches"), list):
+        raise ValueError("LanguageTool response has no matches list")
+    return payload["matches"]
+
+def section_writing_messages(sections):
+    """
+    Grammar messages for every section. Sections seen before come from the
+    section cache; the others are checked together in one LanguageTool call
+    and the matches are attributed back to sections by offset.
+    """
+    # Findings depend on the grammar service and language, not just the section text
+    checker = hashlib.sha1(f"{app.config['LANGUAGETOOL_URL']}|{app.config['LANGUAGETOOL_LANGUAGE']}".encode('utf-8'))
+    kind = f"writing@{checker.hexdigest()[:16]}"
+    per_section = [section_cache.get(kind, section) for section in sections]
+    pending = [index for index, messages in enumerate(per_section) if messages is None]
+    if pending:
+        starts = []
+        offset = 0
+        for index in pending:
+            starts.append(offset)
+            offset += len(sections[index]) + 1
+        found = {index: [] for index in pending}
+        for match in languagetool_matches("\n".join(sections[index] for index in pending)):
+            position = bisect.bisect_right(starts, match.get("offset", 0)) - 1
+            found[pending[max(0, position)]].append(match["message"])
+        for index in pending:
+            section_cache.put(kind, sections[index], found[index])
+            per_section[index] = found[index]
+    return [message for messages in per_section for message in messages]
+
+GRAMMAR_CHECK_FAILED = "Grammar check failed"
+
+def check_writing_quality(text, sections=None):
     try:
-        response = requests.post(url, data=data, timeout=10)
-        matches = response.json().get("matches", [])
-        grammar_errors = len(matches)
-        suggestions = list(set([m["message"] for m in matches]))
+        if sections is not None and section_cache is not None:
+            messages = section_writing_messages(sections)
+        else:
+            messages = [m["message"] for m in languagetool_matches(text)]
+        grammar_errors = len(messages)
+        suggestions = list(dict.fromkeys(messages))
         writing_score = max(0, 100 - grammar_errors * 4)
         return {
             "writing_score": writing_score,
@@ -43,10 +274,23 @@ def check_writing_quality(text):
             "suggestions": suggestions[:5]
         }
     except Exception as e:
-        return {"writing_score": 0, "grammar_errors": 0, "suggestions": ["Grammar check failed"]}
+        return {"writing_score": 0, "grammar_errors": 0, "suggestions": [GRAMMAR_CHECK_FAILED]}
+
+def grammar_check_failed(writing_quality):
+    """Whether a writing_quality payload is the placeholder of a failed grammar check"""
+    return writing_quality.get("suggestions") == [GRAMMAR_CHECK_FAILED]
 
-def detect_missing_sections(text):
-    text_lower = text.lower()
+def reusable_analysis(result, snapshot):
+    """
+    Whether a stored analysis may stand in for a near-duplicate upload: its
+    skills must come from the pinned catalog, and a failed grammar check must
+    not be served again
+    """
+    return (result.get('skills', {}).get('catalog_version') == snapshot.digest
+            and not grammar_check_failed(result.get('writing_quality', {})))
+
+def detect_missing_sections(match_text):
+    """Section gaps, searched in the folded text view"""
     
     # Define section keywords with multiple variations
     sections = {
@@ -75,33 +319,26 @@ def detect_missing_sections(text):
     missing = []
     for section_name, section_info in sections.items():
         # Check if any of the keywords for this section are found
-        found = any(keyword in text_lower for keyword in section_info["keywords"])
+        found = any(keyword in match_text for keyword in section_info["keywords"])
         if not found:
             missing.append({"section": section_name, "message": section_info["message"]})
     
     return missing
 
-def smart_recommendations(text):
+def smart_recommendations(match_text):
     recs = []
-    if "helped" in text:
+    if "helped" in match_text:
         recs.append("Use stronger verbs like 'led', 'managed', 'achieved'.")
-    if "%" not in text and "increased" in text:
+    if "%" not in match_text and "increased" in match_text:
         recs.append("Quantify your impact (e.g., 'increased revenue by 15%').")
     return recs
 
-def compare_with_jd(cv_text, jd_text, skills_list):
-    cv_skills = [s for s in skills_list if s.lower() in cv_text.lower()]
-    jd_skills = [s for s in skills_list if s.lower() in jd_text.lower()]
-    missing_skills = [s for s in jd_skills if s not in cv_skills]
-    perfect_matches = [s for s in jd_skills if s in cv_skills]
-    match_score = int(100 * len(perfect_matches) / max(1, len(jd_skills)))
-    return {
-        "match_score": match_score,
-        "missing_skills": missing_skills,
-        "perfect_matches": perfect_matches
-    }
+def compare_with_jd(cv_text, jd_text):
+    """Match CV skills against JD skills; the JD's skill set is cached by content hash"""
+    return jd_registry.compare(cv_text, jd_text)
 
 @app.route('/api/health', methods=['GET'])
+@admission_lane('light')
 def health_check():
     """Health check endpoint"""
     return jsonify({
@@ -110,136 +347,564 @@ def health_check():
         'service': 'Resume Inspector API'
     })
 
+class AnalysisError(Exception):
+    """Analysis failure that should be reported to the client as-is"""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def save_upload(file):
+    """
+    Validate the uploaded file and save it to a temporary directory.
+    Returns (file_id, filename, temp_dir, file_path).
+    """
+    if file.filename == '':
+        raise AnalysisError('No file selected')
+
+    if not allowed_file(file.filename):
+        raise AnalysisError('Invalid file type. Please upload PDF or DOCX files only.')
+
+    # Create unique filename and save file temporarily
+    file_id = str(uuid.uuid4())
+    filename = secure_filename(file.filename)
+    file_extension = filename.rsplit('.', 1)[1].lower()
+
+    temp_dir = tempfile.mkdtemp()
+    file_path = os.path.join(temp_dir, f"{file_id}.{file_extension}")
+    file.save(file_path)
+    return file_id, filename, temp_dir, file_path
+
+def cleanup_upload(temp_dir, file_path):
+    if os.path.exists(file_path):
+        os.remove(file_path)
+    if os.path.exists(temp_dir):
+        os.rmdir(temp_dir)
+
+def section_skills(sections, snapshot):
+    """Categorized skills of the whole text, re-running extraction only for unseen sections"""
+    # Cached results are only valid for the catalog they were extracted with
+    kind = f"skills@{snapshot.digest}.{FOLD_VERSION}"
+    merged = {}
+    for section in sections:
+        found = section_cache.get(kind, section)
+        if found is None:
+            found = skill_matcher.extract_skills(section, snapshot)
+            section_cache.put(kind, section, found)
+        for category, skills in found.items():
+            merged.setdefault(category, set()).update(skills)
+    return {category: sorted(skills) for category, skills in merged.items()}
+
+def section_features(sections):
+    """Scoring features of the whole text, recombined from cached per-section features"""
+    features = []
+    for section in sections:
+        cached = section_cache.get(f"features@{FEATURES_DIGEST}", section)
+        if cached is None:
+            cached = resume_scorer.extract_features(section)
+            section_cache.put(f"features@{FEATURES_DIGEST}", section, cached)
+        features.append(cached)
+    return resume_scorer.merge_features(features)
+
+def analyze_skills(text, sections=None, snapshot=None, match_text=None):
+    """Skills stage payload, computed against a single catalog snapshot"""
+    snapshot = snapshot or skill_matcher.snapshot
+    if match_text is None:
+        match_text = fold_text(text)
+    # Extract skills (now returns categorized skills)
+    if sections is not None and section_cache is not None:
+        skills_found = section_skills(sections, snapshot)
+    else:
+        skills_found = skill_matcher.extract_skills(text, snapshot, match_text)
+    print("Skills found:", skills_found)
+
+    # Get all skills with presence indicators
+    all_skills_with_presence = skill_matcher.get_all_skills_with_presence(text, snapshot, match_text)
+
+    return {
+        'skills': {
+            'found': skills_found,  # Categorized skills found in CV
+            'all_skills_with_presence': all_skills_with_presence,  # All skills with presence indicators
+            'missing': skill_matcher.get_missing_skills(skills_found, snapshot),
+            'total_found': sum(len(category_skills) for category_skills in skills_found.values()),
+            'coverage': skill_matcher.calculate_skill_coverage(skills_found, snapshot),
+            'catalog_version': snapshot.digest
+        }
+    }
+
+def analyze_scores(text, skills_found, sections=None, match_text=None):
+    """Scores stage payload"""
+    if match_text is None:
+        match_text = fold_text(text)
+    # Flatten skills for scoring (backward compatibility)
+    flat_skills_found = []
+    for category_skills in skills_found.values():
+        flat_skills_found.extend(category_skills)
+
+    # Calculate scores
+    if sections is not None and section_cache is not None:
+        scores = resume_scorer.score_features(section_features(sections), flat_skills_found)
+    else:
+        scores = resume_scorer.calculate_scores(text, flat_skills_found, match_text)
+    print("Scores:", scores)
+    # Generate recommendations
+    recommendations = resume_scorer.generate_recommendations(text, flat_skills_found, scores)
+    smart_recs = smart_recommendations(match_text)
+    return {
+        'scores': scores,
+        'summary': {
+            'overall_score': scores['overall'],
+            'grade': scores['grade'],
+            'strengths': scores['strengths'],
+            'weaknesses': scores['weaknesses']
+        },
+        'recommendations': recommendations + smart_recs
+    }
+
+def extraction_memory_guard():
+    """
+    Memory guard for one extraction: aborts once the worker's resident memory
+    has grown by more than EXTRACTION_MAX_RSS_MB since the extraction started.
+    Measuring growth rather than total RSS keeps memory the worker already
+    held (RSS rarely shrinks) from failing every later upload.
+    """
+    limit = app.config['EXTRACTION_MAX_RSS_MB'] * 1024 * 1024
+    baseline = current_rss()
+
+    def guard():
+        if limit and current_rss() - baseline > limit:
+            raise ExtractionMemoryExceeded(f"Worker memory grew by more than {app.config['EXTRACTION_MAX_RSS_MB']} MB")
+    return guard
+
+def preflight_check(file_info):
+    """
+    Decide from the preflight inspection whether a document should go through
+    full extraction. Returns the rejection reason, or None when accepted.
+    """
+    if file_info['extension'] == 'unknown':
+        return 'Could not read the file. Please ensure it is a valid PDF or DOCX document.'
+    if file_info['extension'] == 'doc':
+        return 'Legacy Word (.doc) files are not supported. Please save the resume as PDF or DOCX.'
+    if file_info['encrypted']:
+        return 'This PDF is password-protected. Please upload an unprotected copy.'
+    # Only PDFs have a real page count; a DOCX count is a guess, so its exact text size is checked instead
+    if file_info['extension'] == 'pdf' and file_info['page_count'] > app.config['PREFLIGHT_MAX_PAGES']:
+        return f"The document has {file_info['page_count']} pages; resumes are limited to {app.config['PREFLIGHT_MAX_PAGES']} pages."
+    if file_info['extension'] == 'docx' and file_info['approx_text_chars'] > app.config['EXTRACTION_MAX_CHARS']:
+        return 'This document is too large to analyze. Please upload a shorter resume.'
+    if not file_info['has_text_layer']:
+        if needs_ocr(file_info):
+            return None
+        return 'The file has no text layer (it looks like a scanned image). Please upload a text-based PDF or DOCX.'
+    if file_info['approx_text_chars'] < app.config['PREFLIGHT_MIN_TEXT_CHARS']:
+        return 'Could not extract sufficient text from the file. Please ensure the file contains readable text.'
+    return None
+
+def inspect_upload(file_path):
+    """
+    Preflight inspection of an upload, run in a 'light' lane slot: it has to
+    happen before admission to the analysis lanes (it decides which one the
+    document queues in), but a burst of uploads must still be bounded
+    """
+    with admission.lane('light').slot():
+        return get_file_info(file_path)
+
+def needs_ocr(file_info):
+    """Scanned PDFs go through OCR when it is enabled"""
+    return ocr_service is not None and file_info['extension'] == 'pdf' and not file_info['has_text_layer']
+
+def pipeline_lane(file_info):
+    """
+    Admission lane an analysis runs in. Scanned documents queue in the OCR
+    lane instead of the analysis lane, so slow OCR never holds one of the few
+    analysis slots that text-based uploads need.
+    """
+    return admission.lane('ocr' if needs_ocr(file_info) else 'analysis')
+
+def extract_text_with_ocr(file_path, content_hash, page_count):
+    """Text of a scanned PDF, from the OCR cache or the OCR pool (run inside an 'ocr' lane slot)"""
+    text = ocr_service.cached(content_hash)
+    if text is None:
+        try:
+            text = ocr_service.extract(file_path, content_hash, page_count)
+        except OcrError as e:
+            print(f"OCR failed for {file_path}: {str(e)}")
+            raise AnalysisError('Could not read the scanned document. Please upload a text-based PDF or DOCX.', 422)
+    if len(text) > app.config['EXTRACTION_MAX_CHARS']:
+        raise ExtractionLimitExceeded(f"Extracted text exceeds {app.config['EXTRACTION_MAX_CHARS']} characters")
+    return text
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def run_analysis_stages(file_path, file_id, filename, jd_text='', file_info=None):
+    """
+    Run the analysis pipeline, yielding (stage, payload) as each stage finishes.
+    Each payload holds top-level keys of the final analysis result, which is
+    saved to the analysis store once every stage has finished.
+    file_info is the preflight inspection, if the caller already ran it.
+    """
+    content_hash = file_sha256(file_path)
+    analysis_result = {}
+    meter = StageMeter()
+    for stage, payload in _analysis_stages(file_path, file_id, filename, jd_text, content_hash, file_info):
+        meter.record(stage)
+        analysis_result.update(payload)
+        yield stage, payload
+        # Time spent by the consumer (e.g. writing an SSE event) is not part of the next stage
+        meter.resume()
+
+    stats_payload = {'pipeline_stats': meter.report()}
+    analysis_result.update(stats_payload)
+    yield 'pipeline_stats', stats_payload
+
+    try:
+        analysis_store.put(file_id, content_hash, analysis_result)
+    except Exception as e:
+        print(f"Error saving analysis {file_id}: {str(e)}")
+
+def _analysis_stages(file_path, file_id, filename, jd_text, content_hash, file_info=None):
+    # Pin the analyzers once so a catalog reload mid-request cannot mix versions
+    snapshot = skill_matcher.snapshot
+    registry = jd_registry
+
+    # Reject unsuitable documents before the expensive extraction path
+    if file_info is None:
+        file_info = get_file_info(file_path)
+    rejection = preflight_check(file_info)
+    if rejection:
+        raise AnalysisError(rejection)
+
+    # Extract text from the file
+    print(f"Extracting text from {file_path}")
+    use_ocr = needs_ocr(file_info)
+    try:
+        if use_ocr:
+            raw_text = extract_text_with_ocr(file_path, content_hash, file_info['page_count'])
+        else:
+            raw_text = extract_text_from_file(file_path, max_chars=app.config['EXTRACTION_MAX_CHARS'],
+                                              memory_guard=extraction_memory_guard())
+        normalized = normalize_text(raw_text)
+    except ExtractionMemoryExceeded as e:
+        # Growth also includes other requests on this worker, so do not blame the document
+        print(f"Extraction aborted for {file_path}: {str(e)}")
+        raise AnalysisError('The server is short on memory right now. Please try again shortly.', 503)
+    except ExtractionLimitExceeded as e:
+        print(f"Extraction aborted for {file_path}: {str(e)}")
+        raise AnalysisError('This document is too large to analyze. Please upload a shorter resume.', 413)
+    # Display text for users and section splitting, folded view for every matcher
+    extracted_text, match_text = normalized
+    print("Extracted text:", extracted_text[:500])
+    if not extracted_text or len(extracted_text.strip()) < 50:
+        raise AnalysisError('Could not extract sufficient text from the file. Please ensure the file contains readable text.')
+
+    # Near-duplicate lookup: reuse the skills, scores and writing check of a
+    # previously analyzed resume that differs only in small edits
+    signature = None
+    duplicate = None
+    if dedup_index is not None:
+        signature = dedup_index.signature(extracted_text)
+        match = dedup_index.query(signature)
+        if match is not None:
+            # The index only holds signatures; the earlier analysis may already be evicted from the store
+            reused = analysis_store.get(match[0])
+            if reused is not None and reusable_analysis(reused, snapshot):
+                duplicate = (*match, reused)
+
+    extraction = {
+        'file_id': file_id,
+        'filename': filename,
+        'file_size': file_info['size'],
+        'page_count': file_info['page_count'],
+        'analysis_date': datetime.now().isoformat(),
+        'text_length': len(extracted_text),
+        'ocr': use_ocr
+    }
+    if duplicate is not None:
+        duplicate_id, similarity, reused = duplicate
+        print(f"Near-duplicate of {duplicate_id} (similarity {similarity:.2f}), reusing its analysis")
+        # Only the similarity is reported: the earlier file_id belongs to another upload
+        extraction['near_duplicate'] = {'similarity': round(similarity, 3)}
+    yield 'extraction', extraction
+
+    # Analyze the resume
+    print("Analyzing resume content...")
+    sections = split_sections(extracted_text) if section_cache is not None else None
+    if duplicate is not None:
+        skills_payload = {'skills': reused['skills']}
+    else:
+        skills_payload = analyze_skills(extracted_text, sections, snapshot, match_text)
+    yield 'skills', skills_payload
+
+    if duplicate is not None:
+        scores_payload = {key: reused[key] for key in ('scores', 'summary', 'recommendations')}
+    else:
+        scores_payload = analyze_scores(extracted_text, skills_payload['skills']['found'], sections, match_text)
+    yield 'scores', scores_payload
+
+    yield 'missing_sections', {'missing_sections': detect_missing_sections(match_text)}
+
+    # Writing quality is the slowest stage (remote grammar check), so it goes last
+    if duplicate is not None:
+        writing_payload = {'writing_quality': reused['writing_quality']}
+    else:
+        writing_payload = {'writing_quality': check_writing_quality(extracted_text, sections)}
+    yield 'writing_quality', writing_payload
+
+    # Analyses with a failed grammar check are not offered for reuse
+    if signature is not None and duplicate is None and not grammar_check_failed(writing_payload['writing_quality']):
+        dedup_index.add(file_id, signature)
+
+    # JD Matching (optional, if provided)
+    jd_matching = None
+    if jd_text:
+        jd_matching = registry.compare(extracted_text, jd_text, match_text)
+    yield 'jd_matching', {'jd_matching': jd_matching}
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.route('/api/analyze', methods=['POST'])
+@profiled
 def analyze_resume():
-    """Main endpoint for CV analysis - always analyze fresh, do not save or load from disk"""
+    """Main endpoint for CV analysis - results are kept in the analysis store, near-duplicates reuse earlier analyses"""
     try:
         # Check if file was uploaded
         if 'file' not in request.files:
             return jsonify({'error': 'No file provided'}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
-        
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'Invalid file type. Please upload PDF or DOCX files only.'}), 400
-        
-        # Create unique filename and save file temporarily
-        file_id = str(uuid.uuid4())
-        filename = secure_filename(file.filename)
-        file_extension = filename.rsplit('.', 1)[1].lower()
-        
-        # Save file temporarily
-        temp_dir = tempfile.mkdtemp()
-        file_path = os.path.join(temp_dir, f"{file_id}.{file_extension}")
-        file.save(file_path)
-        
+
+        file_id, filename, temp_dir, file_path = save_upload(request.files['file'])
         try:
-            # Extract text from the file
-            print(f"Extracting text from {file_path}")
-            extracted_text = extract_text_from_file(file_path)
-            print("Extracted text:", extracted_text[:500])
-            if not extracted_text or len(extracted_text.strip()) < 50:
-                return jsonify({'error': 'Could not extract sufficient text from the file. Please ensure the file contains readable text.'}), 400
-            
-            # Analyze the resume
-            print("Analyzing resume content...")
-            # Extract skills (now returns categorized skills)
-            skills_found = skill_matcher.extract_skills(extracted_text)
-            print("Skills found:", skills_found)
-            
-            # Get all skills with presence indicators
-            all_skills_with_presence = skill_matcher.get_all_skills_with_presence(extracted_text)
-            
-            # Flatten skills for scoring (backward compatibility)
-            flat_skills_found = []
-            for category_skills in skills_found.values():
-                flat_skills_found.extend(category_skills)
-            
-            # Calculate scores
-            scores = resume_scorer.calculate_scores(extracted_text, flat_skills_found)
-            print("Scores:", scores)
-            # Generate recommendations
-            recommendations = resume_scorer.generate_recommendations(extracted_text, flat_skills_found, scores)
-            # --- New: Writing Quality ---
-            writing_quality = check_writing_quality(extracted_text)
-            # --- New: Missing Sections ---
-            missing_sections = detect_missing_sections(extracted_text)
-            # --- New: Smart Recommendations ---
-            smart_recs = smart_recommendations(extracted_text)
-            # --- New: JD Matching (optional, if provided) ---
-            jd_text = request.form.get('jd_text', '')
-            jd_matching = None
-            if jd_text:
-                jd_matching = compare_with_jd(extracted_text, jd_text, skill_matcher.get_all_skills())
-            # Prepare response
-            analysis_result = {
-                'file_id': file_id,
-                'filename': filename,
-                'file_size': os.path.getsize(file_path),
-                'analysis_date': datetime.now().isoformat(),
-                'scores': scores,
-                'skills': {
-                    'found': skills_found,  # Categorized skills found in CV
-                    'all_skills_with_presence': all_skills_with_presence,  # All skills with presence indicators
-                    'missing': skill_matcher.get_missing_skills(skills_found),
-                    'total_found': len(flat_skills_found),
-                    'coverage': skill_matcher.calculate_skill_coverage(skills_found)
-                },
-                'recommendations': recommendations + smart_recs,
-                'text_length': len(extracted_text),
-                'summary': {
-                    'overall_score': scores['overall'],
-                    'grade': scores['grade'],
-                    'strengths': scores['strengths'],
-                    'weaknesses': scores['weaknesses']
-                },
-                'writing_quality': writing_quality,
-                'missing_sections': missing_sections,
-                'jd_matching': jd_matching
-            }
+            file_info = inspect_upload(file_path)
+            analysis_result = {}
+            with pipeline_lane(file_info).slot():
+                for _stage, payload in run_analysis_stages(file_path, file_id, filename,
+                                                           request.form.get('jd_text', ''), file_info):
+                    analysis_result.update(payload)
             return jsonify(analysis_result)
         finally:
             # Clean up temporary file
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
+            cleanup_upload(temp_dir, file_path)
+    except AdmissionRejected as e:
+        return busy_response(e.retry_after)
+    except AnalysisError as e:
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         print(f"Error during analysis: {str(e)}")
         return jsonify({'error': 'An error occurred during analysis. Please try again.'}), 500
 
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_resume_stream():
+    """
+    Streaming variant of /api/analyze: emits one Server-Sent Event per
+    finished stage, then a final 'done' event
+    """
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file provided'}), 400
+
+    try:
+        file_id, filename, temp_dir, file_path = save_upload(request.files['file'])
+    except AnalysisError as e:
+        return jsonify({'error': e.message}), e.status_code
+
+    try:
+        file_info = inspect_upload(file_path)
+        lane = pipeline_lane(file_info)
+        lane.acquire()
+    except AdmissionRejected as e:
+        cleanup_upload(temp_dir, file_path)
+        return busy_response(e.retry_after)
+    jd_text = request.form.get('jd_text', '')
+    started = time.monotonic()
+    finish_lock = threading.Lock()
+    finished = []
+
+    def finish():
+        # Runs when the stream ends and again when the response is closed (which
+        # may happen without the stream ever starting); only the first call counts
+        with finish_lock:
+            if finished:
+                return
+            finished.append(True)
+        cleanup_upload(temp_dir, file_path)
+        lane.release(time.monotonic() - started)
+
+    def generate():
+        # The admission slot is held until the stream finishes or the client disconnects
+        try:
+            for stage, payload in run_analysis_stages(file_path, file_id, filename, jd_text, file_info):
+                yield sse_event(stage, payload)
+            yield sse_event('done', {'file_id': file_id})
+        except AnalysisError as e:
+            yield sse_event('error', {'error': e.message})
+        except Exception as e:
+            print(f"Error during analysis: {str(e)}")
+            yield sse_event('error', {'error': 'An error occurred during analysis. Please try again.'})
+        finally:
+            finish()
+
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(finish)
+    return response
+
+@app.route('/api/inspect', methods=['POST'])
+@admission_lane('light')
+def inspect_file():
+    """Preflight inspection of an upload without running the analysis"""
+    try:
+        if 'file' not in request.files:
+            return jsonify({'error': 'No file provided'}), 400
+
+        _file_id, filename, temp_dir, file_path = save_upload(request.files['file'])
+        try:
+            file_info = get_file_info(file_path)
+        finally:
+            cleanup_upload(temp_dir, file_path)
+        rejection = preflight_check(file_info)
+        return jsonify({
+            'filename': filename,
+            'file_info': file_info,
+            'accepted': rejection is None,
+            'ocr': rejection is None and needs_ocr(file_info),
+            'reason': rejection
+        })
+    except AnalysisError as e:
+        return jsonify({'error': e.message}), e.status_code
+    except Exception as e:
+        print(f"Error during inspection: {str(e)}")
+        return jsonify({'error': 'An error occurred during inspection. Please try again.'}), 500
+
 @app.route('/api/skills', methods=['GET'])
+@admission_lane('light')
 def get_skills():
     """Get available skills for reference"""
+    snapshot = skill_matcher.snapshot
     return jsonify({
-        'skills': skill_matcher.get_all_skills(),
-        'categories': skill_matcher.get_skill_categories()
+        'version': snapshot.digest,
+        'source': snapshot.source,
+        'skills': list(snapshot.all_skills),
+        'categories': {category: list(skills) for category, skills in snapshot.categories.items()}
     })
 
+@app.route('/api/skills/reload', methods=['POST'])
+@admission_lane('light')
+def reload_skills():
+    """
+    Swap in a new skills catalog (admin only): the JSON body if given, otherwise
+    the catalog reloaded from disk. In-flight requests finish on the old snapshot.
+    A JSON body is persisted to the catalog file and artifact; the other worker
+    processes pick it up on their next request.
+    """
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    catalog = None
+    if request.get_data():
+        # A body that is not valid JSON must not fall back to reloading from disk
+        catalog = request.get_json(force=True, silent=True)
+        if catalog is None:
+            return jsonify({'error': 'Request body must be a JSON catalog'}), 400
+        valid = isinstance(catalog, dict) and all(
+            isinstance(skills, list) and all(isinstance(skill, str) for skill in skills)
+            for skills in catalog.values()
+        )
+        if not valid:
+            return jsonify({'error': 'Catalog must map each category to a list of skills'}), 400
+
+    try:
+        snapshot = skill_matcher.swap_catalog(catalog, persist=True)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except OSError as e:
+        print(f"Could not persist skills catalog: {str(e)}")
+        return jsonify({'error': 'Could not save the skills catalog'}), 500
+    publish_skills_snapshot(snapshot)
+    return jsonify({'version': snapshot.digest, 'source': snapshot.source, 'total_skills': len(snapshot.all_skills)})
+
 @app.route('/api/analysis/<file_id>', methods=['GET'])
+@admission_lane('light')
 def get_analysis(file_id):
     """Retrieve a previous analysis result"""
     try:
-        result_file = os.path.join('resume_storage', f"{file_id}_analysis.json")
-        if os.path.exists(result_file):
-            with open(result_file, 'r') as f:
-                return jsonify(json.load(f))
+        result = analysis_store.get(file_id)
+        if result is not None:
+            return jsonify(result)
         else:
             return jsonify({'error': 'Analysis not found'}), 404
     except Exception as e:
         return jsonify({'error': 'Error retrieving analysis'}), 500
 
 @app.route('/api/jd-match', methods=['POST'])
+@admission_lane('light')
+@profiled
 def jd_match():
     data = request.json
     cv_text = data.get('cv_text', '')
     jd_text = data.get('jd_text', '')
-    skills_list = skill_matcher.get_all_skills()
-    result = compare_with_jd(cv_text, jd_text, skills_list)
+    result = compare_with_jd(cv_text, jd_text)
     return jsonify(result)
 
+@app.route('/api/jds', methods=['GET', 'POST'])
+@admission_lane('light')
+def job_descriptions():
+    """List registered job descriptions, or register a new one"""
+    if request.method == 'GET':
+        return jsonify({'job_descriptions': jd_registry.list_registered()})
+
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    jd_text = data.get('jd_text', '')
+    title = data.get('title', '')
+    if not isinstance(jd_text, str) or not isinstance(title, str):
+        return jsonify({'error': 'jd_text and title must be strings'}), 400
+    if not jd_text.strip():
+        return jsonify({'error': 'No job description provided'}), 400
+    entry = jd_registry.register(jd_text, title)
+    return jsonify(jd_registry.describe(entry)), 201
+
+@app.route('/api/jd-match/batch', methods=['POST'])
+@admission_lane('light')
+def jd_match_batch():
+    """Score one CV against several registered job descriptions (all of them by default)"""
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Request body must be a JSON object'}), 400
+    cv_text = data.get('cv_text', '')
+    jd_ids = data.get('jd_ids')
+    if not isinstance(cv_text, str):
+        return jsonify({'error': 'cv_text must be a string'}), 400
+    # A bare string would otherwise be ranked one character at a time
+    if jd_ids is not None and not (isinstance(jd_ids, list) and all(isinstance(jd_id, str) for jd_id in jd_ids)):
+        return jsonify({'error': 'jd_ids must be a list of job description ids'}), 400
+    matches = jd_registry.rank(cv_text, jd_ids)
+    unknown = [jd_id for jd_id in (jd_ids or []) if jd_registry.get(jd_id) is None]
+    return jsonify({'matches': matches, 'unknown_jd_ids': unknown})
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+@admission_lane('light')
+def download_profile(profile_id):
+    """Download a stored cProfile dump (admin only); open it with pstats or snakeviz"""
+    if not is_admin_request():
+        return jsonify({'error': 'Admin token required'}), 403
+    path = profiler.path_for(secure_filename(profile_id))
+    if not os.path.exists(path):
+        return jsonify({'error': 'Profile not found'}), 404
+    return send_file(os.path.abspath(path), mimetype='application/octet-stream',
+                     as_attachment=True, download_name=f"{profile_id}.prof")
+
+@app.route('/api/admission', methods=['GET'])
+def admission_stats():
+    """Queue depth and rejection counts per admission lane, for capacity planning"""
+    return jsonify({
+        'lanes': admission.stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 if __name__ == '__main__':
     # Create storage directory if it doesn't exist
     os.makedirs('resume_storage', exist_ok=True)
@@ -0,0 +1,233 @@
+"""
+Load test for /api/analyze: replays a corpus of resumes against a locally
+started backend (serve.py) at a fixed concurrency, with the LanguageTool
+grammar check replaced by a local stub. Reports throughput, latency
+percentiles, error rates and per-stage timings, and exits with status 1
+when an SLO budget is exceeded.
+
+Usage (from resume_inspector/backend):
+    python benchmarks/loadtest.py --corpus path/to/resumes --requests 200 \\
+        --concurrency 8 --slo-p95-ms 1500 --slo-error-rate 0.01
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESUME_EXTENSIONS = ('.pdf', '.docx')
+
+
+def start_grammar_stub(latency_ms):
+    """
+    Local stand-in for the LanguageTool API: answers every check with no
+    matches after a fixed delay
+    """
+    class GrammarStubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(latency_ms / 1000)
+            body = json.dumps({'matches': []}).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GrammarStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_backend(port, grammar_url, workers, allow_caching, workdir):
+    env = dict(os.environ)
+    env.update({
+        'PORT': str(port),
+        'WEB_CONCURRENCY': str(workers),
+        'LANGUAGETOOL_URL': grammar_url,
+        'PYTHONPATH': BACKEND_DIR + os.pathsep + env.get('PYTHONPATH', ''),
+    })
+    if not allow_caching:
+        # Every request should pay for the full pipeline
+        env['DEDUP_ENABLED'] = 'false'
+        env['INCREMENTAL_ANALYSIS'] = 'false'
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, 'serve.py')],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('Backend exited during startup')
+        try:
+            if requests.get(f"{base_url}/api/health", timeout=1).ok:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError('Backend did not become healthy within 60 seconds')
+
+
+def load_corpus(corpus_dir):
+    paths = sorted(
+        os.path.join(corpus_dir, name) for name in os.listdir(corpus_dir)
+        if name.lower().endswith(RESUME_EXTENSIONS)
+    )
+    if not paths:
+        raise SystemExit(f"No PDF or DOCX files found in {corpus_dir}")
+    return [(os.path.basename(path), open(path, 'rb').read()) for path in paths]
+
+
+def send_analysis(base_url, filename, content):
+    started = time.perf_counter()
+    try:
+        response = requests.post(f"{base_url}/api/analyze", files={'file': (filename, content)}, timeout=120)
+        latency_ms = (time.perf_counter() - started) * 1000
+        stages = {}
+        if response.ok:
+            stages = response.json().get('pipeline_stats', {}).get('stages', {})
+        return {'status': response.status_code, 'latency_ms': latency_ms, 'stages': stages}
+    except requests.RequestException as e:
+        return {'status': type(e).__name__, 'latency_ms': (time.perf_counter() - started) * 1000, 'stages': {}}
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(results, elapsed):
+    latencies = [r['latency_ms'] for r in results if r['status'] == 200]
+    errors = [r for r in results if r['status'] != 200]
+    stage_durations = defaultdict(list)
+    for result in results:
+        for stage, stats in result['stages'].items():
+            stage_durations[stage].append(stats['duration_ms'])
+
+    return {
+        'requests': len(results),
+        'elapsed_s': round(elapsed, 2),
+        'throughput_rps': round(len(results) / elapsed, 2) if elapsed else 0.0,
+        'error_rate': round(len(errors) / len(results), 4) if results else 0.0,
+        'status_counts': dict(Counter(str(r['status']) for r in results)),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50), 1),
+            'p95': round(percentile(latencies, 95), 1),
+            'p99': round(percentile(latencies, 99), 1),
+            'max': round(max(latencies), 1) if latencies else 0.0
+        },
+        'stages_ms': {
+            stage: {'p50': round(percentile(values, 50), 1), 'p95': round(percentile(values, 95), 1)}
+            for stage, values in stage_durations.items()
+        }
+    }
+
+
+def check_slo(summary, args):
+    violations = []
+    if args.slo_p95_ms is not None and summary['latency_ms']['p95'] > args.slo_p95_ms:
+        violations.append(f"p95 {summary['latency_ms']['p95']} ms > {args.slo_p95_ms} ms")
+    if args.slo_p99_ms is not None and summary['latency_ms']['p99'] > args.slo_p99_ms:
+        violations.append(f"p99 {summary['latency_ms']['p99']} ms > {args.slo_p99_ms} ms")
+    if args.slo_error_rate is not None and summary['error_rate'] > args.slo_error_rate:
+        violations.append(f"error rate {summary['error_rate']} > {args.slo_error_rate}")
+    if args.slo_min_rps is not None and summary['throughput_rps'] < args.slo_min_rps:
+        violations.append(f"throughput {summary['throughput_rps']} rps < {args.slo_min_rps} rps")
+    return violations
+
+
+def print_report(summary, violations):
+    print(f"Requests:    {summary['requests']} in {summary['elapsed_s']} s")
+    print(f"Throughput:  {summary['throughput_rps']} req/s")
+    print(f"Error rate:  {summary['error_rate']:.2%}  {summary['status_counts']}")
+    latency = summary['latency_ms']
+    print(f"Latency ms:  p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}")
+    if summary['stages_ms']:
+        print("Stages ms:")
+        for stage, stats in summary['stages_ms'].items():
+            print(f"  {stage:<18} p50 {stats['p50']:>8}  p95 {stats['p95']:>8}")
+    if violations:
+        print("SLO FAILED:")
+        for violation in violations:
+            print(f"  - {violation}")
+    else:
+        print("SLO OK")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--corpus', required=True, help='Directory of PDF/DOCX resumes to replay')
+    arg_parser.add_argument('--requests', type=int, default=100, help='Total requests to send')
+    arg_parser.add_argument('--concurrency', type=int, default=4)
+    arg_parser.add_argument('--workers', type=int, default=2, help='Backend worker processes')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--url', help='Test an already running backend instead of starting one')
+    arg_parser.add_argument('--grammar-latency-ms', type=float, default=0, help='Delay of the grammar stub')
+    arg_parser.add_argument('--allow-caching', action='store_true',
+                            help='Keep near-duplicate and per-section caches enabled')
+    arg_parser.add_argument('--slo-p95-ms', type=float)
+    arg_parser.add_argument('--slo-p99-ms', type=float)
+    arg_parser.add_argument('--slo-error-rate', type=float)
+    arg_parser.add_argument('--slo-min-rps', type=float)
+    arg_parser.add_argument('--json', help='Also write the summary to this file')
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    grammar_stub = None
+    backend = None
+    workdir = tempfile.TemporaryDirectory()
+    try:
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            grammar_stub = start_grammar_stub(args.grammar_latency_ms)
+            grammar_url = f"http://127.0.0.1:{grammar_stub.server_address[1]}/v2/check"
+            backend, base_url = start_backend(args.port, grammar_url, args.workers,
+                                              args.allow_caching, workdir.name)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            futures = [
+                pool.submit(send_analysis, base_url, *corpus[i % len(corpus)])
+                for i in range(args.requests)
+            ]
+            results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=30)
+        if grammar_stub is not None:
+            grammar_stub.shutdown()
+        workdir.cleanup()
+
+    summary = summarize(results, elapsed)
+    violations = check_slo(summary, args)
+    summary['slo_violations'] = violations
+    print_report(summary, violations)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Startup benchmark: measures, in fresh interpreter processes, the time to
+import the Flask app and the latency of the first requests.
+
+Usage (from resume_inspector/backend):
+    python benchmarks/startup_benchmark.py --runs 5 --resume path/to/cv.pdf
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from loadtest import start_grammar_stub
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter for every run so nothing is cached between runs
+CHILD_SCRIPT = r'''
+import json
+import sys
+import time
+
+resume_path = sys.argv[1] if len(sys.argv) > 1 else ""
+timings = {}
+
+started = time.perf_counter()
+import app as backend
+timings["import_ms"] = (time.perf_counter() - started) * 1000
+client = backend.app.test_client()
+
+started = time.perf_counter()
+client.get("/api/health")
+timings["first_health_ms"] = (time.perf_counter() - started) * 1000
+
+if resume_path:
+    for key in ("first_analyze_ms", "second_analyze_ms"):
+        with open(resume_path, "rb") as f:
+            started = time.perf_counter()
+            response = client.post("/api/analyze", data={"file": (f, resume_path.rsplit("/", 1)[-1])})
+            timings[key] = (time.perf_counter() - started) * 1000
+        timings[key.replace("_ms", "_status")] = response.status_code
+
+print(json.dumps(timings))
+'''
+
+
+def run_once(resume_path, warm_up, grammar_url):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = BACKEND_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env['WARM_UP_ON_START'] = 'true' if warm_up else 'false'
+    # Keep the remote grammar check out of the measurements
+    env['LANGUAGETOOL_URL'] = grammar_url
+    # Disable the near-duplicate index and section cache so the second analysis is not a cache hit
+    env['DEDUP_ENABLED'] = 'false'
+    env['INCREMENTAL_ANALYSIS'] = 'false'
+    with tempfile.TemporaryDirectory() as workdir:
+        completed = subprocess.run(
+            [sys.executable, '-c', CHILD_SCRIPT, resume_path],
+            cwd=workdir, env=env, capture_output=True, text=True, check=True
+        )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--runs', type=int, default=5)
+    arg_parser.add_argument('--resume', default='', help='PDF or DOCX used for the analyze timings')
+    arg_parser.add_argument('--warm-up', action='store_true', help='Set WARM_UP_ON_START in the child processes')
+    args = arg_parser.parse_args()
+
+    resume_path = os.path.abspath(args.resume) if args.resume else ''
+    grammar_stub = start_grammar_stub(0)
+    grammar_url = f"http://127.0.0.1:{grammar_stub.server_address[1]}/v2/check"
+    try:
+        runs = [run_once(resume_path, args.warm_up, grammar_url) for _ in range(args.runs)]
+    finally:
+        grammar_stub.shutdown()
+
+    print(f"{'metric':<22}{'median':>10}{'min':>10}{'max':>10}")
+    for key in runs[0]:
+        if not key.endswith('_ms'):
+            continue
+        values = [run[key] for run in runs]
+        print(f"{key:<22}{statistics.median(values):>10.1f}{min(values):>10.1f}{max(values):>10.1f}")
+
+    # Timings of failed requests measure the error path, not an analysis
+    failed = False
+    for key in runs[0]:
+        if not key.endswith('_status'):
+            continue
+        statuses = [run[key] for run in runs]
+        print(f"{key:<22}{', '.join(str(status) for status in statuses)}")
+        failed = failed or any(status != 200 for status in statuses)
+    if failed:
+        print("FAILED: some requests did not return 200")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
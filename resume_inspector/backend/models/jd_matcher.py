@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from parser.extract_text import fold_text
+
+
+class JobDescriptionRegistry:
+    """
+    Job descriptions with their skill sets extracted once and cached by
+    content hash. Skill sets are integer bitsets over the skills list, so
+    matching a CV against many JDs is one AND per JD.
+    """
+    def __init__(self, skills_list: List[str], registry_path: str, max_cached: int = 1024):
+        self.skills = list(skills_list)
+        self._skill_keys = [fold_text(skill) for skill in self.skills]
+        self.registry_path = registry_path
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._masks: "OrderedDict[str, int]" = OrderedDict()
+        self._registered: Dict[str, Dict[str, Any]] = {}
+        self._registry_offset = 0
+        self._reload()
+
+    @staticmethod
+    def content_hash(jd_text: str) -> str:
+        return hashlib.sha256(jd_text.strip().encode('utf-8')).hexdigest()
+
+    def skill_mask(self, text: str, match_text: Optional[str] = None) -> int:
+        """
+        Bitset of the skills mentioned in the text; pass the folded view as
+        match_text when it is already at hand
+        """
+        if match_text is None:
+            match_text = fold_text(text)
+        mask = 0
+        for index, key in enumerate(self._skill_keys):
+            if key in match_text:
+                mask |= 1 << index
+        return mask
+
+    def jd_mask(self, jd_text: str) -> int:
+        """
+        Skill bitset of a job description, cached by content hash
+        """
+        key = self.content_hash(jd_text)
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                return mask
+        mask = self.skill_mask(jd_text)
+        with self._lock:
+            self._masks[key] = mask
+            if len(self._masks) > self.max_cached:
+                self._masks.popitem(last=False)
+        return mask
+
+    def _skills_in(self, mask: int) -> List[str]:
+        return [skill for index, skill in enumerate(self.skills) if mask >> index & 1]
+
+    def match(self, cv_mask: int, jd_mask: int) -> Dict[str, Any]:
+        """
+        Compare a CV skill bitset with a JD skill bitset
+        """
+        perfect = cv_mask & jd_mask
+        missing = jd_mask & ~cv_mask
+        jd_count = bin(jd_mask).count('1')
+        return {
+            "match_score": int(100 * bin(perfect).count('1') / max(1, jd_count)),
+            "missing_skills": self._skills_in(missing),
+            "perfect_matches": self._skills_in(perfect)
+        }
+
+    def compare(self, cv_text: str, jd_text: str, cv_match_text: Optional[str] = None) -> Dict[str, Any]:
+        return self.match(self.skill_mask(cv_text, cv_match_text), self.jd_mask(jd_text))
+
+    def register(self, jd_text: str, title: str = '') -> Dict[str, Any]:
+        """
+        Register a job description; its id is the content hash, so registering
+        the same text twice returns the existing entry
+        """
+        jd_id = self.content_hash(jd_text)
+        self._reload()
+        with self._lock:
+            if jd_id in self._registered:
+                return self._registered[jd_id]
+            entry = {
+                'jd_id': jd_id,
+                'title': title,
+                'jd_text': jd_text,
+                'registered_at': datetime.now().isoformat()
+            }
+            os.makedirs(os.path.dirname(self.registry_path) or '.', exist_ok=True)
+            with open(self.registry_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._registered[jd_id] = entry
+        self.jd_mask(jd_text)
+        return entry
+
+    def _reload(self):
+        # Pick up registrations appended by other worker processes
+        if not os.path.exists(self.registry_path):
+            return
+        with self._lock:
+            with open(self.registry_path, 'rb') as f:
+                f.seek(self._registry_offset)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    entry = json.loads(line.decode('utf-8'))
+                    self._registered.setdefault(entry['jd_id'], entry)
+                    self._registry_offset += len(line)
+
+    def get(self, jd_id: str) -> Optional[Dict[str, Any]]:
+        if jd_id not in self._registered:
+            self._reload()
+        return self._registered.get(jd_id)
+
+    def describe(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Public view of a registered JD with its extracted skills
+        """
+        return {
+            'jd_id': entry['jd_id'],
+            'title': entry['title'],
+            'registered_at': entry['registered_at'],
+            'skills': self._skills_in(self.jd_mask(entry['jd_text']))
+        }
+
+    def list_registered(self) -> List[Dict[str, Any]]:
+        self._reload()
+        return [self.describe(entry) for entry in list(self._registered.values())]
+
+    def rank(self, cv_text: str, jd_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Score one CV against several registered JDs, best match first.
+        Unknown jd_ids are skipped.
+        """
+        if jd_ids is None:
+            self._reload()
+            jd_ids = list(self._registered)
+        cv_mask = self.skill_mask(cv_text)
+
+        matches = []
+        for jd_id in jd_ids:
+            entry = self.get(jd_id)
+            if entry is None:
+                continue
+            result = self.match(cv_mask, self.jd_mask(entry['jd_text']))
+            matches.append({'jd_id': jd_id, 'title': entry['title'], **result})
+        matches.sort(key=lambda m: (m['match_score'], len(m['perfect_matches'])), reverse=True)
+        return matches
@@ -0,0 +1,18 @@
+import threading
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+
+def get_nlp():
+    """
+    Load the spaCy English pipeline on first use and share it between
+    SkillMatcher and ResumeScorer
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                import spacy
+                _nlp = spacy.load("en_core_web_sm")
+    return _nlp
@@ -1,43 +1,223 @@
+import hashlib
+import json
 import re
-import spacy
-from typing import Dict, List, Any
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional
 from datetime import datetime
-from dateutil import parser
+from models.nlp import get_nlp
+from parser.extract_text import fold_text, FOLD_VERSION
+
+DATE_RANGE_PATTERN = re.compile(r'([A-Za-z]+ \d{4})\s*-\s*([A-Za-z]+ \d{4})')
+YEARS_PATTERN = re.compile(r"(\d+)\+?\s+years?", re.IGNORECASE)
+
+DEGREE_PATTERNS = [
+    r'(master\s+of\s+\w+)',
+    r'(bachelor\s+of\s+\w+)',
+    r'(licence\s+en\s+\w+)',
+    r'(licence\s+\w+)',
+    r'(specialiste\s+en\s+\w+)',
+    r'(specialiste\s+\w+)',
+    r'(phd\s+in\s+\w+)',
+    r'(doctorate\s+in\s+\w+)',
+    r'(mba\s+in\s+\w+)',
+    r'(diploma\s+in\s+\w+)',
+    r'(certificate\s+in\s+\w+)'
+]
+
+# Standalone degree keywords, checked in order
+ACADEMIC_LEVELS = [
+    (('phd', 'doctorate'), 'PhD'),
+    (('master',), 'Master'),
+    (('mba',), 'MBA'),
+    (('licence',), 'Licence'),
+    (('specialiste',), 'Specialiste'),
+    (('bachelor', 'bsc', 'ba', 'bs'), 'Bachelor'),
+    (('associate',), 'Associate'),
+    (('diploma',), 'Diploma'),
+    (('certificate',), 'Certificate'),
+    (('high school',), 'High School')
+]
+INSTITUTION_KEYWORDS = ['university', 'college', 'institute']
+
+EXPERIENCE_KEYWORDS = [
+    'experience', 'work', 'employment', 'job', 'position', 'role',
+    'years', 'months', 'worked', 'employed', 'career'
+]
+EXPERIENCE_PATTERNS = [
+    r'\d+\s*years?\s*of\s*experience',
+    r'experience.*\d+\s*years?',
+    r'\d{4}\s*-\s*\d{4}',
+    r'\d{4}\s*-\s*present'
+]
+
+EDUCATION_KEYWORDS = [
+    'education', 'degree', 'bachelor', 'master', 'phd', 'diploma',
+    'university', 'college', 'school', 'graduated', 'certification',
+    'certificate', 'course', 'training'
+]
+DEGREE_LEVEL_SCORES = {
+    'phd': 100,
+    'doctorate': 100,
+    'master': 80,
+    'bachelor': 60,
+    'associate': 40,
+    'diploma': 30,
+    'certificate': 20
+}
+
+STRUCTURE_KEYWORDS = [
+    'summary', 'objective', 'experience', 'education', 'skills',
+    'projects', 'achievements', 'certifications', 'languages'
+]
+
+ACTION_VERBS = [
+    'developed', 'implemented', 'managed', 'created', 'designed',
+    'built', 'maintained', 'improved', 'increased', 'decreased',
+    'led', 'coordinated', 'organized', 'analyzed', 'researched',
+    'solved', 'optimized', 'automated', 'deployed', 'configured'
+]
+ACHIEVEMENT_PATTERNS = [
+    r'\d+%',
+    r'\$\d+',
+    r'\d+\s*users?',
+    r'\d+\s*customers?',
+    r'increased.*\d+%',
+    r'decreased.*\d+%'
+]
+
+# Every keyword and pattern whose presence feeds a score
+ALL_KEYWORDS = frozenset(
+    EXPERIENCE_KEYWORDS + EDUCATION_KEYWORDS + list(DEGREE_LEVEL_SCORES) + STRUCTURE_KEYWORDS +
+    ACTION_VERBS + INSTITUTION_KEYWORDS + [keyword for keywords, _ in ACADEMIC_LEVELS for keyword in keywords]
+)
+ALL_PATTERNS = frozenset(EXPERIENCE_PATTERNS + ACHIEVEMENT_PATTERNS)
+
+# Bump when extract_features changes in a way the keyword and pattern lists below do not show
+FEATURES_VERSION = 1
+# Identifies how features are extracted, so cached section features are never
+# reused after the keywords, patterns or fold_text change
+FEATURES_DIGEST = hashlib.sha1(json.dumps([
+    FEATURES_VERSION, FOLD_VERSION, sorted(ALL_KEYWORDS), sorted(ALL_PATTERNS), DEGREE_PATTERNS,
+    DATE_RANGE_PATTERN.pattern, YEARS_PATTERN.pattern
+]).encode('utf-8')).hexdigest()[:16]
 
 class ResumeScorer:
     def __init__(self):
-        self.nlp = spacy.load("en_core_web_sm")
-        self.scoring_weights = {
+        # Read-only, so requests on concurrent threads can share it safely
+        self.scoring_weights: Mapping[str, float] = MappingProxyType({
             'skills': 0.3,
             'experience': 0.25,
             'education': 0.15,
             'formatting': 0.15,
             'keywords': 0.15
-        }
+        })
+
+    @property
+    def nlp(self):
+        """
+        spaCy pipeline, loaded on first use
+        """
+        return get_nlp()
     
-    def calculate_scores(self, text: str, skills_found: list) -> Dict[str, Any]:
+    def calculate_scores(self, text: str, skills_found: list, match_text: Optional[str] = None) -> Dict[str, Any]:
         """
         Calculate comprehensive resume scores using weighted criteria
         """
+        return self.score_features(self.extract_features(text, match_text), skills_found)
+
+    def extract_features(self, text: str, match_text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Extract the text features the component scores are computed from.
+        Keywords are searched in match_text, the folded view of the text
+        (derived if omitted). Features of consecutive sections of a text can be
+        combined with merge_features, so unchanged sections never need to be rescanned.
+        """
+        if match_text is None:
+            match_text = fold_text(text)
+
+        # Date ranges like 'April 2023 - August 2023'
+        date_range_months = 0
+        date_ranges = DATE_RANGE_PATTERN.findall(text)
+        if date_ranges:
+            from dateutil import parser  # Deferred: only needed once a request is scored
+            for start, end in date_ranges:
+                try:
+                    start_date = parser.parse(start)
+                    end_date = parser.parse(end)
+                    months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
+                    if months > 0:
+                        date_range_months += months
+                except Exception:
+                    continue
+
+        years_mentioned = [int(m) for m in YEARS_PATTERN.findall(text)]
+
+        # First match of each degree pattern
+        degree_matches = {}
+        for pattern in DEGREE_PATTERNS:
+            matches = re.findall(pattern, match_text)
+            if matches:
+                degree_matches[pattern] = matches[0]
+
+        return {
+            'length': len(text),
+            'non_empty_lines': sum(1 for line in text.split('\n') if line.strip()),
+            'keywords': {keyword for keyword in ALL_KEYWORDS if keyword in match_text},
+            'patterns': {pattern for pattern in ALL_PATTERNS if re.search(pattern, match_text)},
+            'date_range_months': date_range_months,
+            'max_years_mentioned': max(years_mentioned) if years_mentioned else 0,
+            'degree_matches': degree_matches
+        }
+
+    def merge_features(self, features_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine the features of consecutive sections, in document order, into
+        the features of the newline-joined text
+        """
+        merged = {
+            'length': max(0, len(features_list) - 1),  # Newlines joining the sections
+            'non_empty_lines': 0,
+            'keywords': set(),
+            'patterns': set(),
+            'date_range_months': 0,
+            'max_years_mentioned': 0,
+            'degree_matches': {}
+        }
+        for features in features_list:
+            merged['length'] += features['length']
+            merged['non_empty_lines'] += features['non_empty_lines']
+            # Cached features hold these as lists
+            merged['keywords'].update(features['keywords'])
+            merged['patterns'].update(features['patterns'])
+            merged['date_range_months'] += features['date_range_months']
+            merged['max_years_mentioned'] = max(merged['max_years_mentioned'], features['max_years_mentioned'])
+            for pattern, match in features['degree_matches'].items():
+                merged['degree_matches'].setdefault(pattern, match)
+        return merged
+
+    def score_features(self, features: Dict[str, Any], skills_found: list) -> Dict[str, Any]:
+        """
+        Calculate the weighted scores from extracted (or merged) text features
+        """
         # Extract basic information
-        years_exp = self.extract_years_experience(text)
-        academic_level = self.extract_academic_level(text)
-        found_count = len(skills_found)
+        years_exp = self._years_experience_from_features(features)
+        academic_level = self._academic_level_from_features(features)
         
         # Calculate individual component scores
         skills_score = self._calculate_skills_score(skills_found)
-        experience_score = self._calculate_experience_score(text)
-        education_score = self._calculate_education_score(text)
-        formatting_score = self._calculate_formatting_score(text)
-        keywords_score = self._calculate_keywords_score(text)
+        experience_score = self._calculate_experience_score(features)
+        education_score = self._calculate_education_score(features)
+        formatting_score = self._calculate_formatting_score(features)
+        keywords_score = self._calculate_keywords_score(features)
         
         # Calculate weighted overall score
+        weights = self.scoring_weights
         overall_score = (
-            skills_score * self.scoring_weights['skills'] +
-            experience_score * self.scoring_weights['experience'] +
-            education_score * self.scoring_weights['education'] +
-            formatting_score * self.scoring_weights['formatting'] +
-            keywords_score * self.scoring_weights['keywords']
+            skills_score * weights['skills'] +
+            experience_score * weights['experience'] +
+            education_score * weights['education'] +
+            formatting_score * weights['formatting'] +
+            keywords_score * weights['keywords']
         )
         
         # Ensure score is between 0 and 100
@@ -72,78 +252,36 @@ class ResumeScorer:
         }
     
     def extract_years_experience(self, text):
-        # Try to extract date ranges like 'April 2023 - August 2023'
-        matches = re.findall(r'([A-Za-z]+ \d{4})\s*-\s*([A-Za-z]+ \d{4})', text)
-        total_months = 0
-        for start, end in matches:
-            try:
-                start_date = parser.parse(start)
-                end_date = parser.parse(end)
-                months = (end_date.year - start_date.year) * 12 + (end_date.month - start_date.month)
-                if months > 0:
-                    total_months += months
-            except Exception:
-                continue
-        if total_months:
-            return round(total_months / 12, 1)
-        # Fallback: look for 'X years' patterns
-        matches = re.findall(r"(\d+)\+?\s+years?", text, re.IGNORECASE)
-        years = [int(m) for m in matches]
-        return max(years) if years else 0
+        return self._years_experience_from_features(self.extract_features(text))
+
+    def _years_experience_from_features(self, features: Dict[str, Any]):
+        # Prefer summed date ranges like 'April 2023 - August 2023'
+        if features['date_range_months']:
+            return round(features['date_range_months'] / 12, 1)
+        # Fallback: the largest 'X years' mention
+        return features['max_years_mentioned']
     
     def extract_academic_level(self, text):
         """
         Extract the specific degree name from the CV
         """
-        text_lower = text.lower()
-        
-        # Look for specific degree patterns and extract the full degree name
-        degree_patterns = [
-            r'(master\s+of\s+\w+)',
-            r'(bachelor\s+of\s+\w+)',
-            r'(licence\s+en\s+\w+)',
-            r'(licence\s+\w+)',
-            r'(specialiste\s+en\s+\w+)',
-            r'(specialiste\s+\w+)',
-            r'(phd\s+in\s+\w+)',
-            r'(doctorate\s+in\s+\w+)',
-            r'(mba\s+in\s+\w+)',
-            r'(diploma\s+in\s+\w+)',
-            r'(certificate\s+in\s+\w+)'
-        ]
-        
-        # Try to find specific degree names
-        for pattern in degree_patterns:
-            matches = re.findall(pattern, text_lower)
-            if matches:
+        return self._academic_level_from_features(self.extract_features(text))
+
+    def _academic_level_from_features(self, features: Dict[str, Any]) -> str:
+        # Try to find specific degree names, in pattern priority order
+        for pattern in DEGREE_PATTERNS:
+            if pattern in features['degree_matches']:
                 # Return the first match with proper capitalization
-                degree = matches[0].title()
-                return degree
+                return features['degree_matches'][pattern].title()
         
         # Look for standalone degree keywords and return the specific name
-        if 'phd' in text_lower or 'doctorate' in text_lower:
-            return 'PhD'
-        elif 'master' in text_lower:
-            return 'Master'
-        elif 'mba' in text_lower:
-            return 'MBA'
-        elif 'licence' in text_lower:
-            return 'Licence'
-        elif 'specialiste' in text_lower:
-            return 'Specialiste'
-        elif 'bachelor' in text_lower or 'bsc' in text_lower or 'ba' in text_lower or 'bs' in text_lower:
-            return 'Bachelor'
-        elif 'associate' in text_lower:
-            return 'Associate'
-        elif 'diploma' in text_lower:
-            return 'Diploma'
-        elif 'certificate' in text_lower:
-            return 'Certificate'
-        elif 'high school' in text_lower:
-            return 'High School'
+        keywords = features['keywords']
+        for degree_keywords, name in ACADEMIC_LEVELS:
+            if any(keyword in keywords for keyword in degree_keywords):
+                return name
         
         # If no specific degree found, check for university/college mentions
-        if any(word in text_lower for word in ['university', 'college', 'institute']):
+        if any(word in keywords for word in INSTITUTION_KEYWORDS):
             return 'Degree'
         
         return 'Not Specified'
@@ -171,65 +309,33 @@ class ResumeScorer:
         
         return min(base_score + coverage_bonus, 100)
     
-    def _calculate_experience_score(self, text: str) -> float:
+    def _calculate_experience_score(self, features: Dict[str, Any]) -> float:
         """
         Calculate experience score based on work history
         """
-        # Look for experience indicators
-        experience_keywords = [
-            'experience', 'work', 'employment', 'job', 'position', 'role',
-            'years', 'months', 'worked', 'employed', 'career'
-        ]
-        
         # Count experience-related content
-        experience_count = sum(1 for keyword in experience_keywords if keyword.lower() in text.lower())
+        experience_count = sum(1 for keyword in EXPERIENCE_KEYWORDS if keyword in features['keywords'])
         
         # Look for date patterns (years of experience)
-        year_patterns = [
-            r'\d+\s*years?\s*of\s*experience',
-            r'experience.*\d+\s*years?',
-            r'\d{4}\s*-\s*\d{4}',
-            r'\d{4}\s*-\s*present'
-        ]
-        
-        date_matches = 0
-        for pattern in year_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                date_matches += 1
+        date_matches = sum(1 for pattern in EXPERIENCE_PATTERNS if pattern in features['patterns'])
         
         # Calculate score
         base_score = min(experience_count * 8, 40)
         date_bonus = min(date_matches * 15, 30)
-        length_bonus = min(len(text) / 100, 30)  # Bonus for longer content
+        length_bonus = min(features['length'] / 100, 30)  # Bonus for longer content
         
         return min(base_score + date_bonus + length_bonus, 100)
     
-    def _calculate_education_score(self, text: str) -> float:
+    def _calculate_education_score(self, features: Dict[str, Any]) -> float:
         """
         Calculate education score
         """
-        education_keywords = [
-            'education', 'degree', 'bachelor', 'master', 'phd', 'diploma',
-            'university', 'college', 'school', 'graduated', 'certification',
-            'certificate', 'course', 'training'
-        ]
-        
-        education_count = sum(1 for keyword in education_keywords if keyword.lower() in text.lower())
+        education_count = sum(1 for keyword in EDUCATION_KEYWORDS if keyword in features['keywords'])
         
         # Look for degree levels
-        degree_levels = {
-            'phd': 100,
-            'doctorate': 100,
-            'master': 80,
-            'bachelor': 60,
-            'associate': 40,
-            'diploma': 30,
-            'certificate': 20
-        }
-        
         max_degree_score = 0
-        for degree, score in degree_levels.items():
-            if degree.lower() in text.lower():
+        for degree, score in DEGREE_LEVEL_SCORES.items():
+            if degree in features['keywords']:
                 max_degree_score = max(max_degree_score, score)
         
         base_score = min(education_count * 10, 50)
@@ -237,51 +343,27 @@ class ResumeScorer:
         
         return min(base_score + degree_bonus, 100)
     
-    def _calculate_formatting_score(self, text: str) -> float:
+    def _calculate_formatting_score(self, features: Dict[str, Any]) -> float:
         """
         Calculate formatting and structure score
         """
-        lines = text.split('\n')
-        non_empty_lines = [line.strip() for line in lines if line.strip()]
-        
         # Check for structure indicators
-        structure_keywords = [
-            'summary', 'objective', 'experience', 'education', 'skills',
-            'projects', 'achievements', 'certifications', 'languages'
-        ]
-        
-        structure_count = sum(1 for keyword in structure_keywords if keyword.lower() in text.lower())
+        structure_count = sum(1 for keyword in STRUCTURE_KEYWORDS if keyword in features['keywords'])
         
         # Calculate formatting score
         base_score = min(structure_count * 15, 60)
-        length_bonus = min(len(non_empty_lines) * 2, 40)
+        length_bonus = min(features['non_empty_lines'] * 2, 40)
         
         return min(base_score + length_bonus, 100)
     
-    def _calculate_keywords_score(self, text: str) -> float:
+    def _calculate_keywords_score(self, features: Dict[str, Any]) -> float:
         """
         Calculate keywords and action verbs score
         """
-        action_verbs = [
-            'developed', 'implemented', 'managed', 'created', 'designed',
-            'built', 'maintained', 'improved', 'increased', 'decreased',
-            'led', 'coordinated', 'organized', 'analyzed', 'researched',
-            'solved', 'optimized', 'automated', 'deployed', 'configured'
-        ]
-        
-        keyword_count = sum(1 for verb in action_verbs if verb.lower() in text.lower())
+        keyword_count = sum(1 for verb in ACTION_VERBS if verb in features['keywords'])
         
         # Look for quantifiable achievements
-        achievement_patterns = [
-            r'\d+%',
-            r'\$\d+',
-            r'\d+\s*users?',
-            r'\d+\s*customers?',
-            r'increased.*\d+%',
-            r'decreased.*\d+%'
-        ]
-        
-        achievement_count = sum(1 for pattern in achievement_patterns if re.search(pattern, text, re.IGNORECASE))
+        achievement_count = sum(1 for pattern in ACHIEVEMENT_PATTERNS if pattern in features['patterns'])
         
         base_score = min(keyword_count * 8, 50)
         achievement_bonus = min(achievement_count * 10, 50)
@@ -1,24 +1,231 @@
 import re
 import json
 import os
-from typing import List, Dict, Set
-import spacy
+import threading
+from types import MappingProxyType
+from typing import List, Dict, Set, Mapping, NamedTuple, Tuple, Optional
+from models.nlp import get_nlp
+from parser.extract_text import fold_text
+from models.skills_artifact import ArtifactIndex, SkillsArtifact, build_artifact, open_artifact, source_digest
+
+SKILLS_DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'skills_database.json')
+# Built offline with `python -m models.skills_artifact`
+SKILLS_ARTIFACT_PATH = os.path.join(os.path.dirname(__file__), 'skills_database.bin')
+
+# Compiled once at import so a preforking server shares them with its workers
+SKILLS_SECTION_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+        r'SKILLS?[:\-\s]+([\w\s,\-\.\(\)]+)',
+        r'TECHNICAL SKILLS?[:\-\s]+([\w\s,\-\.\(\)]+)',
+        r'PROGRAMMING SKILLS?[:\-\s]+([\w\s,\-\.\(\)]+)',
+        r'LANGUAGES?[:\-\s]+([\w\s,\-\.\(\)]+)',
+        r'TOOLS?[:\-\s]+([\w\s,\-\.\(\)]+)',
+        r'COMPETENCES?[:\-\s]+([\w\s,\-\.\(\)]+)',  # French
+        r'COMPETENCIES?[:\-\s]+([\w\s,\-\.\(\)]+)',
+        r'TECHNOLOGIES?[:\-\s]+([\w\s,\-\.\(\)]+)'
+    )
+]
+SKILL_DELIMITERS = re.compile(r'[\n,\-•\|\/]+')
+
+class SkillsSnapshot(NamedTuple):
+    """
+    Immutable view of the skills catalog, identified by its source digest.
+    Safe to share between threads; a new catalog means a new snapshot, never
+    a mutation.
+    """
+    categories: Mapping[str, Tuple[str, ...]]
+    all_skills: Tuple[str, ...]
+    # Category -> (skill, folded skill) pairs, searched in the folded text view
+    match_terms: Mapping[str, Tuple[Tuple[str, str], ...]]
+    # Folded skill -> (category, skill) of its first listing, for exact lookups
+    catalog_entry: Mapping[str, Tuple[str, str]]
+    # 'artifact' when loaded from the compiled artifact, 'json' otherwise
+    source: str
+    # Hex digest of the catalog source: the catalog's version, the same in every worker
+    digest: str
+
+def build_snapshot(skills_database: Dict[str, List[str]], digest: bytes) -> SkillsSnapshot:
+    categories = {category: tuple(skills) for category, skills in skills_database.items()}
+    match_terms = {
+        category: tuple((skill, fold_text(skill)) for skill in skills)
+        for category, skills in categories.items()
+    }
+    catalog_entry = {}
+    for category, terms in match_terms.items():
+        for skill, key in terms:
+            catalog_entry.setdefault(key, (category, skill))
+    return SkillsSnapshot(
+        categories=MappingProxyType(categories),
+        all_skills=tuple(skill for skills in categories.values() for skill in skills),
+        match_terms=MappingProxyType(match_terms),
+        catalog_entry=MappingProxyType(catalog_entry),
+        source='json',
+        digest=digest.hex()
+    )
+
+def snapshot_from_artifact(artifact: SkillsArtifact) -> SkillsSnapshot:
+    """
+    Snapshot over a compiled artifact: match keys come precomputed and exact
+    lookups stay in the shared memory map
+    """
+    match_terms = {category: tuple(terms) for category, terms in artifact.categories()}
+    categories = {category: tuple(skill for skill, _ in terms) for category, terms in match_terms.items()}
+    return SkillsSnapshot(
+        categories=MappingProxyType(categories),
+        all_skills=tuple(skill for skills in categories.values() for skill in skills),
+        match_terms=MappingProxyType(match_terms),
+        catalog_entry=ArtifactIndex(artifact),
+        source='artifact',
+        digest=artifact.digest.hex()
+    )
 
 class SkillMatcher:
-    def __init__(self):
-        self.skills_database = self._load_skills_database()
-        self.all_skills = self._get_all_skills_from_database()
-        self.nlp = spacy.load("en_core_web_sm")
+    def __init__(self, artifact_path: Optional[str] = None):
+        self.artifact_path = artifact_path or SKILLS_ARTIFACT_PATH
+        self._swap_lock = threading.Lock()
+        self._source_stamp = self._skills_source_stamp()
+        self._snapshot = self._load_snapshot()
+
+    @property
+    def snapshot(self) -> SkillsSnapshot:
+        """
+        Current catalog snapshot. Capture it once per request and pass it to
+        the other methods to get consistent results across a catalog swap.
+        """
+        return self._snapshot
+
+    @property
+    def skills_database(self) -> Mapping[str, Tuple[str, ...]]:
+        return self._snapshot.categories
+
+    @property
+    def all_skills(self) -> Tuple[str, ...]:
+        return self._snapshot.all_skills
+
+    def swap_catalog(self, skills_database: Optional[Dict[str, List[str]]] = None,
+                     persist: bool = False) -> SkillsSnapshot:
+        """
+        Atomically replace the catalog (reloaded from disk by default) with a
+        new snapshot; requests already holding the old snapshot are unaffected.
+        With persist, a given catalog is also written to the JSON source and the
+        compiled artifact, so it survives restarts and other workers pick it up
+        through refresh().
+        """
+        with self._swap_lock:
+            return self._swap_locked(skills_database, persist)
+
+    def refresh(self) -> Optional[SkillsSnapshot]:
+        """
+        Reload the catalog if the JSON source changed on disk since it was
+        loaded (e.g. another worker persisted a reload). Returns the new
+        snapshot, or None when nothing changed. Costs one stat() otherwise.
+        """
+        if self._skills_source_stamp() == self._source_stamp:
+            return None
+        with self._swap_lock:
+            stamp = self._skills_source_stamp()
+            if stamp == self._source_stamp:
+                return None
+            if self.skills_source_digest().hex() == self._snapshot.digest:
+                self._source_stamp = stamp
+                return None
+            try:
+                return self._swap_locked(None, False)
+            except ValueError:
+                # Keep serving the current catalog instead of retrying on every call
+                self._source_stamp = stamp
+                raise
 
-    def _load_skills_database(self) -> Dict[str, List[str]]:
+    def _swap_locked(self, skills_database: Optional[Dict[str, List[str]]], persist: bool) -> SkillsSnapshot:
+        if skills_database is None:
+            stamp = self._skills_source_stamp()
+            snapshot = self._load_snapshot()
+        else:
+            source = json.dumps(skills_database, indent=2).encode('utf-8')
+            snapshot = build_snapshot(skills_database, source_digest(source))
+        # extract_skills files uncategorized skills under the built-in categories
+        missing = set(self._get_skill_categories()) - set(snapshot.categories)
+        if missing:
+            raise ValueError(f"Catalog is missing categories: {', '.join(sorted(missing))}")
+        if skills_database is not None and persist:
+            stamp = self._persist(skills_database, source)
+        if skills_database is None or persist:
+            self._source_stamp = stamp
+        self._snapshot = snapshot
+        return snapshot
+
+    def _persist(self, skills_database: Dict[str, List[str]], source: bytes) -> Optional[Tuple[int, int, int]]:
+        """
+        Write the catalog to the JSON source, compiling the artifact first so
+        workers that notice the new JSON find a matching artifact. Returns the
+        stamp of the new JSON file.
+        """
+        digest = source_digest(source)
+        try:
+            build_artifact(skills_database, digest, self.artifact_path)
+        except OSError as e:
+            # Workers still load the new catalog, from JSON instead of the artifact
+            print(f"Could not rebuild skills artifact {self.artifact_path}: {str(e)}")
+        tmp_path = f"{SKILLS_DATABASE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(source)
+        os.replace(tmp_path, SKILLS_DATABASE_PATH)
+        return self._skills_source_stamp()
+
+    def _load_snapshot(self) -> SkillsSnapshot:
+        """
+        Snapshot of the catalog on disk, from the compiled artifact when it is
+        up to date with the JSON source
+        """
+        digest = self.skills_source_digest()
+        artifact = open_artifact(self.artifact_path, digest)
+        if artifact is not None:
+            return snapshot_from_artifact(artifact)
+        return build_snapshot(self._load_skills_database(), digest)
+
+    @staticmethod
+    def _skills_source_stamp() -> Optional[Tuple[int, int, int]]:
+        # Each persist renames a new file into place, so the inode changes even
+        # when two writes land within the filesystem's mtime granularity
+        try:
+            stat = os.stat(SKILLS_DATABASE_PATH)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def skills_source_digest() -> bytes:
+        """
+        Digest of the catalog source: the JSON file's bytes, or the built-in
+        default when there is no file
+        """
+        if os.path.exists(SKILLS_DATABASE_PATH):
+            with open(SKILLS_DATABASE_PATH, 'rb') as f:
+                return source_digest(f.read())
+        return source_digest(json.dumps(SkillMatcher._load_skills_database()).encode('utf-8'))
+
+    @staticmethod
+    def read_skills_source() -> Tuple[Dict[str, List[str]], bytes]:
+        """
+        The catalog and its source digest, for building the artifact
+        """
+        return SkillMatcher._load_skills_database(), SkillMatcher.skills_source_digest()
+
+    @property
+    def nlp(self):
+        """
+        spaCy pipeline, loaded on first use
+        """
+        return get_nlp()
+
+    @staticmethod
+    def _load_skills_database() -> Dict[str, List[str]]:
         """
         Load skills database from JSON file or create default
         """
-        skills_file = os.path.join(os.path.dirname(__file__), 'skills_database.json')
-        
-        if os.path.exists(skills_file):
+        if os.path.exists(SKILLS_DATABASE_PATH):
             try:
-                with open(skills_file, 'r') as f:
+                with open(SKILLS_DATABASE_PATH, 'r') as f:
                     return json.load(f)
             except:
                 pass
@@ -56,86 +263,62 @@ class SkillMatcher:
             ]
         }
     
-    def _get_all_skills_from_database(self) -> List[str]:
-        """
-        Get all skills from the database as a flat list
-        """
-        all_skills = []
-        for category_skills in self.skills_database.values():
-            all_skills.extend(category_skills)
-        return all_skills
-
-    def extract_skills(self, text: str) -> Dict[str, List[str]]:
+    def extract_skills(self, text: str, snapshot: Optional[SkillsSnapshot] = None,
+                       match_text: Optional[str] = None) -> Dict[str, List[str]]:
         """
-        Extract skills from CV text and categorize them
+        Extract skills from CV text and categorize them. match_text is the
+        folded view of the text (see normalize_text); it is derived if omitted.
         Returns: Dict with categories as keys and found skills as values
         """
-        text_lower = text.lower()
-        found_skills = {category: [] for category in self.skills_database.keys()}
+        snapshot = snapshot or self._snapshot
+        if match_text is None:
+            match_text = fold_text(text)
+        found_skills = {category: [] for category in snapshot.categories.keys()}
         
-        # 1. Extract from comprehensive skills database with flexible matching
-        for category, skills in self.skills_database.items():
-            for skill in skills:
-                # Check for exact match and variations
-                if skill.lower() in text_lower:
-                    found_skills[category].append(skill)
-                # Also check for common variations (e.g., "Python" vs "python")
-                elif skill.title() in text or skill.upper() in text:
-                    found_skills[category].append(skill)
-                # Check for partial matches (e.g., "Python" in "Python Developer")
-                elif any(skill.lower() in word.lower() for word in text.split()):
+        # 1. Extract from comprehensive skills database; the folded view covers
+        # every case and accent variant (e.g. "Python", "PYTHON", "python developer")
+        for category, terms in snapshot.match_terms.items():
+            for skill, key in terms:
+                if key in match_text:
                     found_skills[category].append(skill)
         
         # 2. Dynamic extraction from SKILLS section (more comprehensive)
-        skills_section_patterns = [
-            r'SKILLS?[:\-\s]+([\w\s,\-\.\(\)]+)',
-            r'TECHNICAL SKILLS?[:\-\s]+([\w\s,\-\.\(\)]+)',
-            r'PROGRAMMING SKILLS?[:\-\s]+([\w\s,\-\.\(\)]+)',
-            r'LANGUAGES?[:\-\s]+([\w\s,\-\.\(\)]+)',
-            r'TOOLS?[:\-\s]+([\w\s,\-\.\(\)]+)',
-            r'COMPETENCES?[:\-\s]+([\w\s,\-\.\(\)]+)',  # French
-            r'COMPETENCIES?[:\-\s]+([\w\s,\-\.\(\)]+)',
-            r'TECHNOLOGIES?[:\-\s]+([\w\s,\-\.\(\)]+)'
-        ]
-        
-        for pattern in skills_section_patterns:
-            skills_sections = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE)
+        for pattern in SKILLS_SECTION_PATTERNS:
+            skills_sections = pattern.findall(text)
             for section in skills_sections:
                 # Split by common delimiters and clean up
-                skills = re.split(r'[\n,\-•\|\/]+', section)
+                skills = SKILL_DELIMITERS.split(section)
                 for skill in skills:
                     skill = skill.strip()
                     if len(skill) > 1:
-                        # Try to categorize the skill
-                        categorized = False
-                        for category, known_skills in self.skills_database.items():
-                            if skill.lower() in [s.lower() for s in known_skills]:
-                                if skill not in found_skills[category]:
-                                    found_skills[category].append(skill)
-                                categorized = True
-                                break
+                        key = fold_text(skill)
+                        # Try to categorize the skill, under its catalog spelling
+                        entry = snapshot.catalog_entry.get(key)
+                        categorized = entry is not None
+                        if categorized and entry[1] not in found_skills[entry[0]]:
+                            found_skills[entry[0]].append(entry[1])
                         
                         # If not categorized, add to appropriate category based on common patterns
                         if not categorized:
-                            if any(tech in skill.lower() for tech in ['python', 'java', 'javascript', 'c++', 'sql', 'html', 'css', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin', 'scala', 'r', 'matlab', 'typescript', 'dart']):
+                            if any(tech in key for tech in ['python', 'java', 'javascript', 'c++', 'sql', 'html', 'css', 'php', 'ruby', 'go', 'rust', 'swift', 'kotlin', 'scala', 'r', 'matlab', 'typescript', 'dart']):
                                 if skill not in found_skills['programming_languages']:
                                     found_skills['programming_languages'].append(skill)
-                            elif any(fw in skill.lower() for fw in ['react', 'angular', 'vue', 'django', 'flask', 'spring', 'express', 'laravel', 'rails', 'asp.net', 'fastapi', 'tensorflow', 'pytorch', 'scikit-learn', 'node.js']):
+                            elif any(fw in key for fw in ['react', 'angular', 'vue', 'django', 'flask', 'spring', 'express', 'laravel', 'rails', 'asp.net', 'fastapi', 'tensorflow', 'pytorch', 'scikit-learn', 'node.js']):
                                 if skill not in found_skills['frameworks']:
                                     found_skills['frameworks'].append(skill)
-                            elif any(db in skill.lower() for db in ['mysql', 'postgresql', 'mongodb', 'redis', 'sqlite', 'oracle', 'sql server', 'elasticsearch', 'cassandra', 'dynamodb', 'firebase']):
+                            elif any(db in key for db in ['mysql', 'postgresql', 'mongodb', 'redis', 'sqlite', 'oracle', 'sql server', 'elasticsearch', 'cassandra', 'dynamodb', 'firebase']):
                                 if skill not in found_skills['databases']:
                                     found_skills['databases'].append(skill)
-                            elif any(cloud in skill.lower() for cloud in ['aws', 'azure', 'google cloud', 'heroku', 'digitalocean', 'linode', 'kubernetes', 'docker', 'terraform', 'jenkins', 'gitlab']):
+                            elif any(cloud in key for cloud in ['aws', 'azure', 'google cloud', 'heroku', 'digitalocean', 'linode', 'kubernetes', 'docker', 'terraform', 'jenkins', 'gitlab']):
                                 if skill not in found_skills['cloud_platforms']:
                                     found_skills['cloud_platforms'].append(skill)
-                            elif any(tool in skill.lower() for tool in ['git', 'jira', 'confluence', 'slack', 'trello', 'figma', 'adobe', 'photoshop', 'illustrator', 'excel', 'powerpoint']):
+                            elif any(tool in key for tool in ['git', 'jira', 'confluence', 'slack', 'trello', 'figma', 'adobe', 'photoshop', 'illustrator', 'excel', 'powerpoint']):
                                 if skill not in found_skills['tools']:
                                     found_skills['tools'].append(skill)
-                            elif any(soft in skill.lower() for soft in ['leadership', 'communication', 'teamwork', 'problem solving', 'critical thinking', 'time management', 'project management', 'collaboration', 'adaptability', 'creativity', 'analytical thinking', 'attention to detail']):
+                            elif any(soft in key for soft in ['leadership', 'communication', 'teamwork', 'problem solving', 'critical thinking', 'time management', 'project management', 'collaboration', 'adaptability', 'creativity', 'analytical thinking', 'attention to detail']):
                                 if skill not in found_skills['soft_skills']:
                                     found_skills['soft_skills'].append(skill)
-                            elif any(lang in skill.lower() for lang in ['english', 'spanish', 'french', 'german', 'chinese', 'japanese', 'arabic', 'portuguese', 'italian', 'russian', 'korean', 'hindi']):
+                            elif any(lang in key for lang in ['english', 'spanish', 'french', 'german', 'chinese', 'japanese', 'arabic', 'portuguese', 'italian', 'russian', 'korean', 'hindi']):
                                 if skill not in found_skills['languages']:
                                     found_skills['languages'].append(skill)
                             else:
@@ -143,31 +326,27 @@ class SkillMatcher:
                                 if skill not in found_skills['programming_languages']:
                                     found_skills['programming_languages'].append(skill)
         
-        # 3. Additional extraction: Look for skills mentioned in context
-        for category, skills in self.skills_database.items():
-            for skill in skills:
-                # Look for skills mentioned in sentences
-                if skill.lower() in text_lower and skill not in found_skills[category]:
-                    found_skills[category].append(skill)
-        
-        # 4. Remove duplicates and sort within each category
+        # 3. Remove duplicates and sort within each category
         for category in found_skills:
             found_skills[category] = sorted(list(set(found_skills[category])))
         
         return found_skills
 
-    def get_all_skills_with_presence(self, cv_text: str) -> Dict[str, List[Dict[str, any]]]:
+    def get_all_skills_with_presence(self, cv_text: str, snapshot: Optional[SkillsSnapshot] = None,
+                                     match_text: Optional[str] = None) -> Dict[str, List[Dict[str, any]]]:
         """
         Get all skills from database with presence indicator for each skill
         Returns: Dict with categories and skills with presence info
         """
-        cv_text_lower = cv_text.lower()
+        snapshot = snapshot or self._snapshot
+        if match_text is None:
+            match_text = fold_text(cv_text)
         result = {}
         
-        for category, skills in self.skills_database.items():
+        for category, terms in snapshot.match_terms.items():
             result[category] = []
-            for skill in skills:
-                present = skill.lower() in cv_text_lower or skill.title() in cv_text or skill.upper() in cv_text
+            for skill, key in terms:
+                present = key in match_text
                 result[category].append({
                     "name": skill,
                     "present_in_cv": present
@@ -175,27 +354,29 @@ class SkillMatcher:
         
         return result
 
-    def get_missing_skills(self, found_skills: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    def get_missing_skills(self, found_skills: Dict[str, List[str]],
+                           snapshot: Optional[SkillsSnapshot] = None) -> Dict[str, List[str]]:
         """
         Get missing skills by category
         """
+        snapshot = snapshot or self._snapshot
         missing = {}
         for category, found in found_skills.items():
-            all_category_skills = self.skills_database.get(category, [])
+            all_category_skills = snapshot.categories.get(category, ())
             missing[category] = [skill for skill in all_category_skills if skill not in found]
         return missing
 
     def get_all_skills(self) -> List[str]:
         """
-        Get all skills as a flat list
+        Get all skills as a flat list (a copy; the catalog itself is immutable)
         """
-        return self.all_skills
+        return list(self._snapshot.all_skills)
 
     def get_skill_categories(self) -> Dict[str, List[str]]:
         """
-        Get skills organized by categories
+        Get skills organized by categories (a copy; the catalog itself is immutable)
         """
-        return self.skills_database
+        return {category: list(skills) for category, skills in self._snapshot.categories.items()}
 
     def _get_skill_categories(self) -> Dict[str, str]:
         """
@@ -211,13 +392,15 @@ class SkillMatcher:
             "languages": "Spoken Languages"
         }
     
-    def calculate_skill_coverage(self, found_skills: Dict[str, List[str]]) -> Dict[str, float]:
+    def calculate_skill_coverage(self, found_skills: Dict[str, List[str]],
+                                 snapshot: Optional[SkillsSnapshot] = None) -> Dict[str, float]:
         """
         Calculate skill coverage percentage by category
         """
+        snapshot = snapshot or self._snapshot
         coverage = {}
         
-        for category, skills in self.skills_database.items():
+        for category, skills in snapshot.categories.items():
             found_count = len(found_skills.get(category, []))
             total_count = len(skills)
             # Ensure coverage doesn't exceed 100%
@@ -0,0 +1,214 @@
+"""
+Precompiled skills catalog: the categories, display spellings, folded match
+keys and a sorted lookup table, packed into one versioned binary file.
+
+Workers open it with mmap, so every process on a host shares one physical
+copy through the page cache, and exact skill lookups binary-search the file
+in place instead of building a dict. Each process still decodes the category
+lists into its snapshot, but without folding any skill. The header records a
+digest of the catalog source and the fold_text version the keys were folded
+with; a stale or unreadable artifact is ignored and the catalog is built from
+JSON as before.
+
+Build it offline (from resume_inspector/backend):
+    python -m models.skills_artifact
+"""
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+from typing import Dict, List, Optional, Tuple
+
+from parser.extract_text import FOLD_VERSION, fold_text
+
+MAGIC = b'RSKA'
+# Bump whenever the layout changes, so old artifacts read as stale
+FORMAT_VERSION = 2
+
+# magic, format version; shared by every layout so old artifacts are recognized
+PREFIX = struct.Struct('<4sH')
+# magic, format version, fold version, source digest, categories, skills, lookup entries, strings size
+HEADER = struct.Struct('<4sHH32sIIII')
+# name offset, name length, first skill index, skill count
+CATEGORY = struct.Struct('<IIII')
+# display offset, display length, key offset, key length, category index
+SKILL = struct.Struct('<IIIII')
+# skill index, ordered by the skill's folded key
+LOOKUP = struct.Struct('<I')
+
+
+def source_digest(source: bytes) -> bytes:
+    return hashlib.sha256(source).digest()
+
+
+def build_artifact(skills_database: Dict[str, List[str]], digest: bytes, path: str):
+    """
+    Compile a catalog into an artifact at path. The file is written aside
+    and renamed into place, so running workers never see a partial artifact.
+    """
+    strings = bytearray()
+
+    def add_string(value: str) -> Tuple[int, int]:
+        encoded = value.encode('utf-8')
+        offset = len(strings)
+        strings.extend(encoded)
+        return offset, len(encoded)
+
+    categories = []
+    skills = []
+    first_index_by_key = {}
+    for category_index, (category, category_skills) in enumerate(skills_database.items()):
+        categories.append((*add_string(category), len(skills), len(category_skills)))
+        for skill in category_skills:
+            key = fold_text(skill).encode('utf-8')
+            # The first listing of a skill owns its lookup entry, as in build_snapshot
+            first_index_by_key.setdefault(key, len(skills))
+            skills.append((*add_string(skill), *add_string(key.decode('utf-8')), category_index))
+    lookup = [first_index_by_key[key] for key in sorted(first_index_by_key)]
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, FOLD_VERSION, digest,
+                            len(categories), len(skills), len(lookup), len(strings)))
+        for entry in categories:
+            f.write(CATEGORY.pack(*entry))
+        for entry in skills:
+            f.write(SKILL.pack(*entry))
+        for skill_index in lookup:
+            f.write(LOOKUP.pack(skill_index))
+        f.write(strings)
+    os.replace(tmp_path, path)
+
+
+class SkillsArtifact:
+    """
+    Read-only view of a compiled catalog, backed by a shared memory map
+    """
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version = PREFIX.unpack_from(self._map, 0)
+        if magic == MAGIC and format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} has format version {format_version}, expected {FORMAT_VERSION}; "
+                             f"rebuild it with python -m models.skills_artifact")
+        (magic, self.format_version, self.fold_version, self.digest, self.category_count, self.skill_count,
+         self.lookup_count, strings_size) = HEADER.unpack_from(self._map, 0)
+        self._categories_offset = HEADER.size
+        self._skills_offset = self._categories_offset + self.category_count * CATEGORY.size
+        self._lookup_offset = self._skills_offset + self.skill_count * SKILL.size
+        self._strings_offset = self._lookup_offset + self.lookup_count * LOOKUP.size
+        if magic != MAGIC or self._strings_offset + strings_size != len(self._map):
+            raise ValueError(f"{path} is not a skills artifact")
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def _skill(self, index: int) -> Tuple[int, int, int, int, int]:
+        return SKILL.unpack_from(self._map, self._skills_offset + index * SKILL.size)
+
+    def categories(self) -> List[Tuple[str, List[Tuple[str, str]]]]:
+        """
+        Every category with its (skill, folded key) pairs, in catalog order
+        """
+        result = []
+        for category_index in range(self.category_count):
+            name_offset, name_length, first, count = CATEGORY.unpack_from(
+                self._map, self._categories_offset + category_index * CATEGORY.size)
+            terms = []
+            for skill_index in range(first, first + count):
+                display_offset, display_length, key_offset, key_length, _ = self._skill(skill_index)
+                terms.append((self._string(display_offset, display_length), self._string(key_offset, key_length)))
+            result.append((self._string(name_offset, name_length), terms))
+        return result
+
+    def keys(self):
+        """
+        Folded keys of the lookup table, in sorted order
+        """
+        for position in range(self.lookup_count):
+            skill_index, = LOOKUP.unpack_from(self._map, self._lookup_offset + position * LOOKUP.size)
+            _, _, key_offset, key_length, _ = self._skill(skill_index)
+            yield self._string(key_offset, key_length)
+
+    def find(self, key: str) -> Optional[Tuple[str, str]]:
+        """
+        (category, skill) of a folded skill key, by binary search over the
+        sorted lookup table in the mapped file
+        """
+        target = key.encode('utf-8')
+        low, high = 0, self.lookup_count
+        while low < high:
+            middle = (low + high) // 2
+            skill_index, = LOOKUP.unpack_from(self._map, self._lookup_offset + middle * LOOKUP.size)
+            display_offset, display_length, key_offset, key_length, category_index = self._skill(skill_index)
+            start = self._strings_offset + key_offset
+            candidate = self._map[start:start + key_length]
+            if candidate < target:
+                low = middle + 1
+            elif candidate > target:
+                high = middle
+            else:
+                name_offset, name_length, _, _ = CATEGORY.unpack_from(
+                    self._map, self._categories_offset + category_index * CATEGORY.size)
+                return self._string(name_offset, name_length), self._string(display_offset, display_length)
+        return None
+
+
+class ArtifactIndex(Mapping):
+    """
+    Folded skill -> (category, skill) mapping served straight from the
+    artifact, used as SkillsSnapshot.catalog_entry
+    """
+    def __init__(self, artifact: SkillsArtifact):
+        self._artifact = artifact
+
+    def __getitem__(self, key):
+        entry = self._artifact.find(key) if isinstance(key, str) else None
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def get(self, key, default=None):
+        entry = self._artifact.find(key) if isinstance(key, str) else None
+        return default if entry is None else entry
+
+    def __iter__(self):
+        return self._artifact.keys()
+
+    def __len__(self):
+        return self._artifact.lookup_count
+
+
+def open_artifact(path: str, digest: bytes) -> Optional[SkillsArtifact]:
+    """
+    The artifact at path if it exists, is readable and was built from the
+    catalog source with this digest by the current fold_text; None otherwise
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        artifact = SkillsArtifact(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Ignoring unreadable skills artifact {path}: {str(e)}")
+        return None
+    if (artifact.format_version != FORMAT_VERSION or artifact.fold_version != FOLD_VERSION
+            or artifact.digest != digest):
+        print(f"Ignoring stale skills artifact {path}; rebuild it with python -m models.skills_artifact")
+        return None
+    return artifact
+
+
+def main():
+    from models.skill_matcher import SkillMatcher, SKILLS_ARTIFACT_PATH
+
+    path = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('SKILLS_ARTIFACT_PATH', SKILLS_ARTIFACT_PATH)
+    catalog, digest = SkillMatcher.read_skills_source()
+    build_artifact(catalog, digest, path)
+    print(f"Wrote {path}: {len(catalog)} categories, {sum(len(skills) for skills in catalog.values())} skills")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,36 +1,84 @@
-import fitz  # PyMuPDF
-from docx import Document
 import os
 import re
+import unicodedata
+from typing import NamedTuple
 
-def extract_text_from_file(file_path):
+# fitz (PyMuPDF), pdfplumber and python-docx are imported inside the functions
+# that use them, so importing this module stays cheap for light endpoints
+
+class ExtractionLimitExceeded(Exception):
+    """
+    Raised when a document exceeds the extracted-text or memory ceiling
+    """
+    pass
+
+class ExtractionMemoryExceeded(ExtractionLimitExceeded):
+    """
+    Raised by a memory guard when extraction grew the worker's memory past
+    its budget; under load this is not necessarily the document's fault
     """
-    Extract text from PDF or DOCX files
+    pass
+
+def extract_text_from_file(file_path, max_chars=None, memory_guard=None):
+    """
+    Extract text from PDF or DOCX files.
+    Extraction stops with ExtractionLimitExceeded once the text grows past
+    max_chars; memory_guard, if given, is called after every page or
+    paragraph batch and may raise ExtractionLimitExceeded itself.
     """
     ext = os.path.splitext(file_path)[1].lower()
     if ext == ".pdf":
         try:
             import pdfplumber
             with pdfplumber.open(file_path) as pdf:
-                return "\n".join([page.extract_text() or "" for page in pdf.pages])
+                pages = []
+                total_chars = 0
+                for page in pdf.pages:
+                    page_text = page.extract_text() or ""
+                    # Drop the parsed layout objects of pages we are done with
+                    page.flush_cache()
+                    pages.append(page_text)
+                    total_chars += len(page_text) + 1
+                    _check_limits(total_chars, max_chars, memory_guard)
+                return "\n".join(pages)
+        except ExtractionLimitExceeded:
+            raise
         except Exception as e:
             print(f"PDF extraction error: {e}")
             return ""
     elif ext == ".docx":
         try:
+            from docx import Document
             doc = Document(file_path)
-            return "\n".join([para.text for para in doc.paragraphs])
+            paragraphs = []
+            total_chars = 0
+            for index, para in enumerate(doc.paragraphs):
+                paragraphs.append(para.text)
+                total_chars += len(para.text) + 1
+                if index % 50 == 0:
+                    _check_limits(total_chars, max_chars, memory_guard)
+            _check_limits(total_chars, max_chars, memory_guard)
+            return "\n".join(paragraphs)
+        except ExtractionLimitExceeded:
+            raise
         except Exception as e:
             print(f"DOCX extraction error: {e}")
             return ""
     else:
         return ""
 
+def _check_limits(total_chars, max_chars, memory_guard):
+    if max_chars and total_chars > max_chars:
+        raise ExtractionLimitExceeded(f"Extracted text exceeds {max_chars} characters")
+    if memory_guard is not None:
+        memory_guard()
+
 def extract_text_from_pdf(file_path):
     """
     Extract text from PDF using PyMuPDF
     """
     try:
+        import fitz  # PyMuPDF
         doc = fitz.open(file_path)
         text = ""
         
@@ -49,6 +97,7 @@ def extract_text_from_docx(file_path):
     Extract text from DOCX using python-docx
     """
     try:
+        from docx import Document
         doc = Document(file_path)
         text = ""
         
@@ -84,29 +133,159 @@ def clean_text(text):
     
     return text
 
-def get_file_info(file_path):
+class NormalizedText(NamedTuple):
+    """
+    Extracted text after the single normalization pass: display is what users
+    see and what sections are split on, match is the lowercase, accent-folded
+    view every matcher and scorer searches in
     """
-    Get basic information about the file
+    display: str
+    match: str
+
+# Invisible characters PDFs leave behind: soft hyphen, zero-width spaces and joiners, BOM
+INVISIBLE_CHARACTERS = dict.fromkeys(map(ord, '\u00ad\u200b\u200c\u200d\u2060\ufeff'))
+HYPHENATED_BREAK = re.compile(r'(\w)[-\u2010\u2011]\n[ \t]*(?=[a-z])')
+HORIZONTAL_WHITESPACE = re.compile(r'[^\S\n]+')
+BLANK_LINES = re.compile(r'\n{3,}')
+
+# Bump whenever fold_text's output changes: compiled skills artifacts store
+# folded keys and are rebuilt when built with another fold version
+FOLD_VERSION = 1
+
+def fold_text(text):
+    """
+    Lowercase, accent-folded form of a text; skills and keywords are folded
+    the same way so matching is a plain substring test
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    if text.isascii():
+        return text
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+def normalize_text(text):
+    """
+    One cleaning pass over extracted text: Unicode compatibility folding (which
+    also splits ligatures like 'ﬁ'), removal of invisible characters, repair of
+    words hyphenated across line breaks, and whitespace collapse. Line breaks
+    are kept so sections can still be split on headings.
+    """
+    if not text:
+        return NormalizedText('', '')
+    text = unicodedata.normalize('NFKC', text).translate(INVISIBLE_CHARACTERS)
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    text = HYPHENATED_BREAK.sub(r'\1', text)
+    text = HORIZONTAL_WHITESPACE.sub(' ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    display = BLANK_LINES.sub('\n\n', text).strip()
+    return NormalizedText(display, fold_text(display))
+
+# Words that open a resume section when they start a short line
+SECTION_HEADINGS = (
+    'summary', 'profile', 'objective', 'experience', 'work experience', 'employment',
+    'education', 'skills', 'technical skills', 'projects', 'certifications', 'certificates',
+    'languages', 'achievements', 'awards', 'interests', 'references', 'competences',
+    'competencies', 'technologies', 'tools', 'formation', 'publications', 'volunteering'
+)
+
+def _is_heading(line):
+    stripped = line.strip().rstrip(':').strip()
+    if not stripped or len(stripped) > 40:
+        return False
+    if stripped.isupper():
+        return True
+    return stripped.lower().startswith(SECTION_HEADINGS)
+
+def split_sections(text):
+    """
+    Split resume text into sections at heading lines, so unchanged sections
+    of a re-uploaded resume can be recognized by content hash.
+    "\n".join(split_sections(text)) == text always holds.
+    """
+    sections = []
+    current = []
+    for line in text.split('\n'):
+        if current and _is_heading(line):
+            sections.append('\n'.join(current))
+            current = []
+        current.append(line)
+    sections.append('\n'.join(current))
+    return sections
+
+_WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_APP_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}'
+
+def _docx_text_size(file_path):
+    """
+    (characters, paragraphs, pages) of a DOCX without building a Document:
+    the counts Word saves in docProps/app.xml, or, when they are missing or
+    zero (files written by other tools), a streaming count of the text runs
+    in word/document.xml
+    """
+    import zipfile
+    from xml.etree import ElementTree
+
+    with zipfile.ZipFile(file_path) as archive:
+        try:
+            props = ElementTree.fromstring(archive.read('docProps/app.xml'))
+        except KeyError:
+            props = None
+        if props is not None:
+            counts = {}
+            for name in ('Characters', 'Paragraphs', 'Pages'):
+                value = props.findtext(_APP_NS + name)
+                counts[name] = int(value) if value and value.isdigit() else 0
+            if counts['Characters'] > 0:
+                return counts['Characters'], counts['Paragraphs'], counts['Pages']
+
+        text_chars = paragraphs = 0
+        with archive.open('word/document.xml') as document:
+            for _event, element in ElementTree.iterparse(document):
+                if element.tag == _WORD_NS + 't':
+                    text_chars += len(element.text or '')
+                elif element.tag == _WORD_NS + 'p':
+                    paragraphs += 1
+                    element.clear()
+        return text_chars, paragraphs, 0
+
+def get_file_info(file_path, sample_pages=2):
+    """
+    Cheap preflight inspection: page count, encryption, whether a text layer
+    exists and approximate text volume, read from document metadata and the
+    first pages only
     """
     try:
         file_size = os.path.getsize(file_path)
         file_extension = file_path.lower().split('.')[-1]
-        
-        if file_extension == 'pdf':
-            doc = fitz.open(file_path)
-            page_count = len(doc)
-            doc.close()
-        elif file_extension in ['doc', 'docx']:
-            doc = Document(file_path)
-            page_count = len(doc.paragraphs) // 20  # Rough estimate
-        else:
-            page_count = 0
-        
-        return {
+        info = {
             'size': file_size,
             'extension': file_extension,
-            'page_count': page_count
+            'page_count': 0,
+            'encrypted': False,
+            'has_text_layer': False,
+            'approx_text_chars': 0
         }
+
+        if file_extension == 'pdf':
+            import fitz  # PyMuPDF
+            doc = fitz.open(file_path)
+            try:
+                info['page_count'] = len(doc)
+                info['encrypted'] = bool(doc.needs_pass)
+                if not info['encrypted'] and len(doc) > 0:
+                    sampled = min(sample_pages, len(doc))
+                    sampled_chars = sum(len(doc.load_page(i).get_text().strip()) for i in range(sampled))
+                    info['has_text_layer'] = sampled_chars > 0
+                    info['approx_text_chars'] = int(sampled_chars / sampled * len(doc))
+            finally:
+                doc.close()
+        elif file_extension == 'docx':
+            text_chars, paragraphs, pages = _docx_text_size(file_path)
+            info['page_count'] = pages or max(1, paragraphs // 20)  # Rough estimate without Word's count
+            info['has_text_layer'] = text_chars > 0
+            info['approx_text_chars'] = text_chars
+
+        return info
     except Exception as e:
         print(f"Error getting file info: {str(e)}")
-        return {'size': 0, 'extension': 'unknown', 'page_count': 0} 
\ No newline at end of file
+        return {'size': 0, 'extension': 'unknown', 'page_count': 0, 'encrypted': False,
+                'has_text_layer': False, 'approx_text_chars': 0}
@@ -0,0 +1,65 @@
+"""
+Production entry point: a preforking Gunicorn server.
+
+The Flask app, skills matcher, compiled patterns and spaCy pipeline are built
+once in the master process, then frozen with gc.freeze() so the garbage
+collector never touches those objects again. Forked workers therefore share
+them copy-on-write instead of each holding a private copy.
+
+Usage (from resume_inspector/backend):
+    WEB_CONCURRENCY=4 PORT=8000 python serve.py
+"""
+import gc
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+
+class ResumeInspectorServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Runs once in the master because preload_app is set. The SQLite-backed
+        # stores connect on first use, so workers never inherit an open connection.
+        from app import app, warm_up
+        warm_up()
+
+        # Keep the collector from touching (and so un-sharing) preloaded objects
+        gc.collect()
+        gc.disable()
+        return app
+
+
+def pre_fork(server, worker):
+    # Move everything built so far into the permanent generation right before forking
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    gc.enable()
+
+
+def server_options():
+    threads = int(os.environ.get('GUNICORN_THREADS', 1))
+    return {
+        'bind': f"0.0.0.0:{os.environ.get('PORT', 8000)}",
+        'workers': int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count())),
+        'threads': threads,
+        'worker_class': 'gthread' if threads > 1 else 'sync',
+        'timeout': int(os.environ.get('GUNICORN_TIMEOUT', 120)),
+        'preload_app': True,
+        'pre_fork': pre_fork,
+        'post_fork': post_fork,
+    }
+
+
+if __name__ == '__main__':
+    os.makedirs('resume_storage', exist_ok=True)
+    ResumeInspectorServer(server_options()).run()
@@ -0,0 +1 @@
+# Services package for request handling and persistence helpers
\ No newline at end of file
@@ -0,0 +1,121 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a lane's wait queue is full or the wait timed out
+    """
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"Lane '{lane}' is saturated")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class Lane:
+    """
+    Concurrency limiter with a bounded wait queue for one class of requests
+    """
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._peak_waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._avg_service_time = 1.0
+
+    def acquire(self):
+        """
+        Take a slot, waiting in the queue if needed. Raises AdmissionRejected
+        when the queue is full or the wait exceeds queue_timeout.
+        """
+        with self._cond:
+            if self._active < self.max_concurrency:
+                self._active += 1
+                self._admitted += 1
+                return
+
+            if self._waiting >= self.max_queue:
+                self._rejected += 1
+                raise AdmissionRejected(self.name, self._retry_after())
+
+            self._waiting += 1
+            self._peak_waiting = max(self._peak_waiting, self._waiting)
+            try:
+                deadline = time.monotonic() + self.queue_timeout
+                while self._active >= self.max_concurrency:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected += 1
+                        self._timed_out += 1
+                        raise AdmissionRejected(self.name, self._retry_after())
+                    self._cond.wait(remaining)
+                self._active += 1
+                self._admitted += 1
+            finally:
+                self._waiting -= 1
+
+    def release(self, service_time: float = None):
+        with self._cond:
+            self._active -= 1
+            if service_time is not None:
+                # Exponential moving average, used for Retry-After estimates
+                self._avg_service_time = 0.8 * self._avg_service_time + 0.2 * service_time
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def _retry_after(self) -> int:
+        # Time for the current queue plus one more request to drain
+        backlog = (self._waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(backlog * self._avg_service_time))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'queue_depth': self._waiting,
+                'peak_queue_depth': self._peak_waiting,
+                'admitted': self._admitted,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out,
+                'avg_service_time': round(self._avg_service_time, 3)
+            }
+
+
+class AdmissionController:
+    """
+    Registry of independent lanes so cheap endpoints never wait behind
+    expensive ones
+    """
+    def __init__(self):
+        self._lanes: Dict[str, Lane] = {}
+
+    def add_lane(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float) -> Lane:
+        lane = Lane(name, max_concurrency, max_queue, queue_timeout)
+        self._lanes[name] = lane
+        return lane
+
+    def lane(self, name: str) -> Lane:
+        return self._lanes[name]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: lane.stats() for name, lane in self._lanes.items()}
@@ -0,0 +1,168 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from services.storage import SqliteConnections
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:  # Fall back to JSON + zlib when the compact codec is unavailable
+    msgpack = None
+    zstandard = None
+
+
+class AnalysisStore:
+    """
+    Persistent store for analysis results in a single SQLite file.
+    Results are encoded with msgpack + zstd (JSON + zlib as fallback), indexed
+    by file_id and content hash, and evicted by TTL and total size.
+    """
+    CODEC_MSGPACK_ZSTD = 'msgpack+zstd'
+    CODEC_JSON_ZLIB = 'json+zlib'
+
+    def __init__(self, db_path: str, ttl_seconds: float = 30 * 24 * 3600,
+                 max_bytes: int = 512 * 1024 * 1024, evict_every: int = 100):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self.codec = self.CODEC_MSGPACK_ZSTD if msgpack is not None else self.CODEC_JSON_ZLIB
+        self._connections = SqliteConnections(db_path, self._create_schema)
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS analyses (
+                    file_id TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    codec TEXT NOT NULL,
+                    payload BLOB NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_analyses_content_hash ON analyses (content_hash)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_analyses_expires_at ON analyses (expires_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses (created_at)')
+
+    def _encode(self, result: Dict[str, Any]) -> bytes:
+        if self.codec == self.CODEC_MSGPACK_ZSTD:
+            return zstandard.ZstdCompressor(level=3).compress(msgpack.packb(result, use_bin_type=True))
+        return zlib.compress(json.dumps(result).encode('utf-8'))
+
+    @classmethod
+    def _decode(cls, codec: str, payload: bytes) -> Dict[str, Any]:
+        if codec == cls.CODEC_MSGPACK_ZSTD:
+            if msgpack is None:
+                raise RuntimeError("msgpack and zstandard are required to read this analysis")
+            return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(payload), raw=False)
+        return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+    def put(self, file_id: str, content_hash: str, result: Dict[str, Any]):
+        """
+        Store an analysis result, replacing any previous one for the same file_id
+        """
+        payload = self._encode(result)
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO analyses (file_id, content_hash, created_at, expires_at, size, codec, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (file_id, content_hash, now, now + self.ttl_seconds, len(payload), self.codec, payload)
+            )
+
+        with self._writes_lock:
+            self._writes += 1
+            run_eviction = self._writes % self.evict_every == 0
+        if run_eviction:
+            self.evict()
+
+    def _get_one(self, where: str, value: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            f'SELECT codec, payload FROM analyses WHERE {where} = ? AND expires_at > ? '
+            'ORDER BY created_at DESC LIMIT 1',
+            (value, time.time())
+        ).fetchone()
+        return self._decode(row[0], row[1]) if row else None
+
+    def get(self, file_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an unexpired analysis result by file_id
+        """
+        return self._get_one('file_id', file_id)
+
+    def get_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent unexpired analysis of a file with this content hash
+        """
+        return self._get_one('content_hash', content_hash)
+
+    def iter_results(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all unexpired analysis results in insertion order
+        """
+        for _rowid, result in self.iter_rows(batch_size=batch_size):
+            yield result
+
+    def iter_rows(self, after_rowid: int = 0, batch_size: int = 1000) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Iterate over (rowid, result) of unexpired results written after the row
+        after_rowid, in write order. Writes are serialized, so the last rowid
+        seen is a watermark for exporting only newer results next time.
+        """
+        conn = self._connection()
+        last_rowid = after_rowid
+        while True:
+            rows = conn.execute(
+                'SELECT rowid, codec, payload FROM analyses WHERE rowid > ? AND expires_at > ? '
+                'ORDER BY rowid LIMIT ?',
+                (last_rowid, time.time(), batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for rowid, codec, payload in rows:
+                last_rowid = rowid
+                yield rowid, self._decode(codec, payload)
+
+    def evict(self) -> int:
+        """
+        Delete expired results, then the oldest ones while over max_bytes.
+        Returns the number of deleted results.
+        """
+        conn = self._connection()
+        with conn:
+            deleted = conn.execute('DELETE FROM analyses WHERE expires_at <= ?', (time.time(),)).rowcount
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM analyses').fetchone()[0]
+            while total > self.max_bytes:
+                rows = conn.execute(
+                    'SELECT file_id, size FROM analyses ORDER BY created_at LIMIT 100'
+                ).fetchall()
+                if not rows:
+                    break
+                victims = []
+                for file_id, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((file_id,))
+                    total -= size
+                conn.executemany('DELETE FROM analyses WHERE file_id = ?', victims)
+                deleted += len(victims)
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        count, total = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses'
+        ).fetchone()
+        return {'count': count, 'bytes': total, 'codec': self.codec}
@@ -0,0 +1,167 @@
+import hashlib
+import random
+import sqlite3
+import struct
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+
+from parser.extract_text import clean_text
+from services.storage import SqliteConnections
+
+# Mersenne prime used for the universal hash family
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+class MinHashIndex:
+    """
+    Near-duplicate resume index: MinHash signatures over word shingles of the
+    normalized text, bucketed with LSH banding so lookups only compare against
+    resumes sharing at least one band. Only signatures are indexed, in a
+    SQLite file shared by every worker process; the analyses themselves stay
+    in the analysis store. Entries expire after ttl_seconds, like the analyses.
+    """
+    def __init__(self, index_path: str, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, threshold: float = 0.9, seed: int = 1,
+                 ttl_seconds: float = 30 * 24 * 3600, evict_every: int = 100):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.index_path = index_path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.evict_every = evict_every
+
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+        # Permutation multipliers split at bit 32, so every product fits in 64 bits
+        self._a_high = np.array([a >> 32 for a, _ in self._perms], dtype=np.uint64)
+        self._a_low = np.array([a & _MAX_HASH for a, _ in self._perms], dtype=np.uint64)
+        self._b = np.array([b for _, b in self._perms], dtype=np.uint64)
+        self._signature_format = struct.Struct(f'<{num_perm}I')
+        self._band_format = struct.Struct(f'<{self.rows}I')
+        self._connections = SqliteConnections(index_path, self._create_schema)
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS signatures (
+                    file_id TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE TABLE IF NOT EXISTS bands (band INTEGER NOT NULL, key BLOB NOT NULL, file_id TEXT NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_bands_key ON bands (band, key)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_bands_file_id ON bands (file_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_signatures_expires_at ON signatures (expires_at)')
+
+    def _shingles(self, text: str) -> set:
+        words = clean_text(text).lower().split()
+        if len(words) < self.shingle_size:
+            return {' '.join(words)} if words else set()
+        return {' '.join(words[i:i + self.shingle_size])
+                for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """
+        Compute the MinHash signature of a resume text
+        """
+        hashes = [int.from_bytes(hashlib.blake2b(s.encode('utf-8'), digest_size=4).digest(), 'little')
+                  for s in self._shingles(text)]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        # min over shingles of ((a * h + b) mod p) & _MAX_HASH for every permutation
+        # at once, in exact 64-bit modular arithmetic (2**61 = 1 mod p)
+        h = np.array(hashes, dtype=np.uint64)[:, None]
+        prime = np.uint64(_MERSENNE_PRIME)
+        high = h * self._a_high  # < 2**61; contributes high * 2**32
+        high = (high >> np.uint64(29)) + ((high & np.uint64((1 << 29) - 1)) << np.uint64(32))
+        low = h * self._a_low  # < 2**64
+        low = (low & prime) + (low >> np.uint64(61))
+        value = high + low + self._b
+        value = (value & prime) + (value >> np.uint64(61))
+        value = np.where(value >= prime, value - prime, value)
+        return tuple(int(v) for v in (value & np.uint64(_MAX_HASH)).min(axis=0))
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """
+        Estimated Jaccard similarity between two signatures
+        """
+        return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, self._band_format.pack(*signature[band * self.rows:(band + 1) * self.rows])
+
+    def query(self, signature: Tuple[int, ...]) -> Optional[Tuple[str, float]]:
+        """
+        Find the most similar unexpired resume above the threshold.
+        Returns (file_id, similarity) or None.
+        """
+        conn = self._connection()
+        now = time.time()
+        candidates = {}
+        for band, key in self._band_keys(signature):
+            rows = conn.execute(
+                'SELECT s.file_id, s.signature FROM bands b JOIN signatures s ON s.file_id = b.file_id '
+                'WHERE b.band = ? AND b.key = ? AND s.expires_at > ?',
+                (band, key, now)
+            ).fetchall()
+            for file_id, packed in rows:
+                candidates[file_id] = packed
+
+        best = None
+        for file_id, packed in candidates.items():
+            score = self.similarity(signature, self._signature_format.unpack(packed))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (file_id, score)
+        return best
+
+    def add(self, file_id: str, signature: Tuple[int, ...]):
+        """
+        Index a resume's signature under its file_id
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM bands WHERE file_id = ?', (file_id,))
+            conn.execute('INSERT OR REPLACE INTO signatures (file_id, signature, expires_at) VALUES (?, ?, ?)',
+                         (file_id, self._signature_format.pack(*signature), time.time() + self.ttl_seconds))
+            conn.executemany('INSERT INTO bands (band, key, file_id) VALUES (?, ?, ?)',
+                             [(band, key, file_id) for band, key in self._band_keys(signature)])
+
+        with self._writes_lock:
+            self._writes += 1
+            run_eviction = self._writes % self.evict_every == 0
+        if run_eviction:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete expired signatures. Returns the number deleted.
+        """
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM bands WHERE file_id IN (SELECT file_id FROM signatures WHERE expires_at <= ?)',
+                         (now,))
+            return conn.execute('DELETE FROM signatures WHERE expires_at <= ?', (now,)).rowcount
+
+    def __len__(self):
+        return self._connection().execute(
+            'SELECT COUNT(*) FROM signatures WHERE expires_at > ?', (time.time(),)
+        ).fetchone()[0]
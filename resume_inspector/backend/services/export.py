@@ -0,0 +1,200 @@
+"""
+Columnar export of stored analysis results for analytics.
+
+Flattens every unexpired result in the analysis store into one row per
+resume (component scores, skill coverage and found skills per category,
+years of experience, academic level) and writes Parquet or Arrow IPC files
+in fixed-size batches, so memory stays flat however many results there are.
+
+Stored results expire, so analytics over a long period need repeated
+exports. With --watermark, each run exports only the results written since
+the previous run with the same watermark file, so files never share rows.
+
+Usage (from resume_inspector/backend):
+    python -m services.export --output exports/analyses.parquet
+    python -m services.export --output exports/analyses.arrow --format arrow
+    python -m services.export --output exports/2024-06-01.parquet --watermark exports/watermark
+"""
+import argparse
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Export is optional; the API itself never needs pyarrow
+    pyarrow = None
+
+FORMATS = ('parquet', 'arrow')
+
+
+class AnalysisExporter:
+    """
+    Writes analysis results as flat, typed columns. The category and
+    component columns are fixed up front from the skills catalog and the
+    scoring weights, so every batch shares one schema.
+    """
+    def __init__(self, categories: List[str], components: List[str], batch_size: int = 10000):
+        if pyarrow is None:
+            raise RuntimeError("pyarrow is required for columnar export (pip install pyarrow)")
+        self.categories = list(categories)
+        self.components = list(components)
+        self.batch_size = max(1, batch_size)
+        self.schema = self._build_schema()
+
+    def _build_schema(self) -> 'pyarrow.Schema':
+        fields = [
+            ('file_id', pyarrow.string()),
+            ('filename', pyarrow.string()),
+            ('analysis_date', pyarrow.timestamp('us')),
+            ('page_count', pyarrow.int32()),
+            ('text_length', pyarrow.int64()),
+            ('ocr', pyarrow.bool_()),
+            ('near_duplicate_similarity', pyarrow.float64()),
+            ('catalog_version', pyarrow.string()),
+            ('overall_score', pyarrow.float64()),
+            ('grade', pyarrow.string()),
+            ('years_experience', pyarrow.float64()),
+            ('academic_level', pyarrow.string()),
+            ('total_skills_found', pyarrow.int32()),
+        ]
+        fields += [(f"score_{component}", pyarrow.float64()) for component in self.components]
+        fields += [(f"coverage_{category}", pyarrow.float64()) for category in self.categories]
+        fields += [(f"skills_{category}", pyarrow.list_(pyarrow.string())) for category in self.categories]
+        return pyarrow.schema(fields)
+
+    def flatten(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        One export row from a nested analysis result; missing values become nulls
+        """
+        scores = result.get('scores') or {}
+        skills = result.get('skills') or {}
+        component_scores = scores.get('component_scores') or {}
+        coverage = skills.get('coverage') or {}
+        found = skills.get('found') or {}
+        near_duplicate = result.get('near_duplicate') or {}
+
+        row = {
+            'file_id': result.get('file_id'),
+            'filename': result.get('filename'),
+            'analysis_date': _parse_date(result.get('analysis_date')),
+            'page_count': result.get('page_count'),
+            'text_length': result.get('text_length'),
+            'ocr': result.get('ocr', False),
+            'near_duplicate_similarity': near_duplicate.get('similarity'),
+            'catalog_version': skills.get('catalog_version'),
+            'overall_score': scores.get('overall'),
+            'grade': scores.get('grade'),
+            'years_experience': scores.get('years_experience'),
+            'academic_level': scores.get('academic_level'),
+            'total_skills_found': skills.get('total_found'),
+        }
+        for component in self.components:
+            row[f"score_{component}"] = component_scores.get(component)
+        for category in self.categories:
+            row[f"coverage_{category}"] = coverage.get(category)
+            row[f"skills_{category}"] = found.get(category, [])
+        return row
+
+    def _batch(self, rows: List[Dict[str, Any]]) -> 'pyarrow.RecordBatch':
+        columns = {name: [row[name] for row in rows] for name in self.schema.names}
+        return pyarrow.RecordBatch.from_pydict(columns, schema=self.schema)
+
+    def export(self, results: Iterable[Dict[str, Any]], output_path: str, fmt: str = 'parquet') -> int:
+        """
+        Write the results to output_path, one row group (or IPC batch) per
+        batch_size rows. The file is written aside and renamed into place.
+        Returns the number of exported rows.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(FORMATS)}")
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        if fmt == 'parquet':
+            writer = pyarrow.parquet.ParquetWriter(tmp_path, self.schema, compression='zstd')
+        else:
+            writer = pyarrow.ipc.new_file(tmp_path, self.schema)
+
+        exported = 0
+        try:
+            rows = []
+            for result in results:
+                rows.append(self.flatten(result))
+                if len(rows) >= self.batch_size:
+                    writer.write_batch(self._batch(rows))
+                    exported += len(rows)
+                    rows = []
+            if rows:
+                writer.write_batch(self._batch(rows))
+                exported += len(rows)
+            writer.close()
+        except BaseException:
+            writer.close()
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, output_path)
+        return exported
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def main():
+    from models.skill_matcher import SkillMatcher
+    from models.scoring import ResumeScorer
+    from services.analysis_store import AnalysisStore
+
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--output', required=True, help='File to write')
+    arg_parser.add_argument('--format', choices=FORMATS, default='parquet')
+    arg_parser.add_argument('--store', default=os.path.join('resume_storage', 'analyses.db'),
+                            help='Analysis store to export from')
+    arg_parser.add_argument('--batch-size', type=int, default=10000, help='Rows per row group')
+    arg_parser.add_argument('--watermark', help='File holding the last exported row; only newer results are '
+                                                'exported, and it is advanced after a successful export')
+    args = arg_parser.parse_args()
+
+    if not os.path.exists(args.store):
+        raise SystemExit(f"No analysis store at {args.store}")
+    store = AnalysisStore(args.store)
+    exporter = AnalysisExporter(list(SkillMatcher().snapshot.categories), list(ResumeScorer().scoring_weights),
+                                batch_size=args.batch_size)
+    after_rowid = _read_watermark(args.watermark) if args.watermark else 0
+    last_rowid = after_rowid
+
+    def results():
+        nonlocal last_rowid
+        for rowid, result in store.iter_rows(after_rowid, batch_size=args.batch_size):
+            last_rowid = rowid
+            yield result
+
+    exported = exporter.export(results(), args.output, args.format)
+    if args.watermark:
+        _write_watermark(args.watermark, last_rowid)
+    print(f"Exported {exported} analyses to {args.output}")
+
+
+def _read_watermark(path: str) -> int:
+    try:
+        with open(path, 'r') as f:
+            return int(f.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _write_watermark(path: str, rowid: int):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(f"{rowid}\n")
+    os.replace(tmp_path, path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import os
+import time
+import tracemalloc
+from typing import Dict, Any
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes. Falls back to the peak RSS
+    where /proc is unavailable, and to 0 when neither can be read.
+    """
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+    return 0
+
+
+class StageMeter:
+    """
+    Per-stage wall time and memory for the analysis pipeline: RSS delta always,
+    plus the tracemalloc peak when tracing is active. tracemalloc is
+    process-wide, so with concurrent requests its peaks include other threads.
+    """
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+        self._start_rss = current_rss()
+        self._peak_rss = self._start_rss
+        self.resume()
+
+    def resume(self):
+        """
+        Start measuring the next stage
+        """
+        self._stage_started = time.perf_counter()
+        self._stage_rss = current_rss()
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+
+    def record(self, stage: str):
+        """
+        Close the current stage under the given name
+        """
+        rss = current_rss()
+        self._peak_rss = max(self._peak_rss, rss)
+        stats = {
+            'duration_ms': round((time.perf_counter() - self._stage_started) * 1000, 2),
+            'rss_delta_mb': round((rss - self._stage_rss) / (1024 * 1024), 2)
+        }
+        if tracemalloc.is_tracing():
+            stats['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        self.stages[stage] = stats
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'stages': self.stages,
+            'total_ms': round((time.perf_counter() - self._started) * 1000, 2),
+            'start_rss_mb': round(self._start_rss / (1024 * 1024), 2),
+            'peak_rss_mb': round(self._peak_rss / (1024 * 1024), 2)
+        }
@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from services.storage import prune_files
+
+
+class OcrError(Exception):
+    """
+    Raised when OCR cannot produce text: Tesseract is missing, a page failed,
+    or the document ran over its time budget
+    """
+    pass
+
+
+def _lower_priority():
+    # OCR workers give way to request threads doing normal text extraction
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+def ocr_page(file_path: str, page_number: int, language: str, dpi: int) -> str:
+    """
+    Rasterize one PDF page and run Tesseract on it (in a pool process)
+    """
+    import fitz  # PyMuPDF
+    doc = fitz.open(file_path)
+    try:
+        page = doc.load_page(page_number)
+        textpage = page.get_textpage_ocr(language=language, dpi=dpi, full=True)
+        return page.get_text(textpage=textpage)
+    finally:
+        doc.close()
+
+
+class OcrService:
+    """
+    OCR for scanned PDFs on a dedicated, bounded process pool. Pages of a
+    document are recognized in parallel; results are cached on disk by the
+    document's content hash, so every worker process can reuse them.
+    """
+    def __init__(self, cache_dir: str, max_workers: int = 1, time_budget: float = 60.0,
+                 language: str = 'eng', dpi: int = 300, max_cached: int = 500):
+        self.cache_dir = cache_dir
+        self.max_workers = max(1, max_workers)
+        self.time_budget = time_budget
+        self.language = language
+        self.dpi = dpi
+        self.max_cached = max_cached
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Created on first use inside the worker, and spawned rather than
+                # forked so it is safe to start from a threaded worker
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_lower_priority)
+            return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor, terminate: bool = False):
+        """
+        Stop handing work to pool; the next document gets a fresh one. With
+        terminate, its processes are killed too, so pages still being
+        recognized stop holding CPU (and OCR slots) after their document gave up.
+        """
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        processes = list((pool._processes or {}).values()) if terminate else []
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def cache_path(self, content_hash: str) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}.txt")
+
+    def cached(self, content_hash: str) -> Optional[str]:
+        try:
+            with open(self.cache_path(content_hash), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def extract(self, file_path: str, content_hash: str, page_count: int) -> str:
+        """
+        Text of a scanned PDF. When the time budget runs out the pool is
+        discarded and its processes terminated, then OcrError is raised.
+        """
+        text = self.cached(content_hash)
+        if text is not None:
+            return text
+
+        pool = self._get_pool()
+        try:
+            futures = [pool.submit(ocr_page, file_path, page_number, self.language, self.dpi)
+                       for page_number in range(page_count)]
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise OcrError('OCR pool is unavailable')
+        _done, pending = wait(futures, timeout=self.time_budget)
+        if pending:
+            self._discard_pool(pool, terminate=True)
+            raise OcrError(f"OCR exceeded the {self.time_budget:g} s budget ({len(pending)} of {page_count} pages left)")
+
+        try:
+            pages = [future.result() for future in futures]
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            raise OcrError('An OCR worker crashed')
+        except Exception as e:
+            # PyMuPDF raises RuntimeError when Tesseract or its language data is missing
+            raise OcrError(str(e))
+
+        text = "\n".join(pages)
+        self._store(content_hash, text)
+        return text
+
+    def _store(self, content_hash: str, text: str):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.cache_path(content_hash)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+            prune_files(self.cache_dir, '.txt', self.max_cached)
+        except OSError as e:
+            print(f"Could not cache OCR result {content_hash}: {str(e)}")
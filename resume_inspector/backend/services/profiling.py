@@ -0,0 +1,92 @@
+import cProfile
+import os
+import pstats
+import random
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+from services.storage import prune_files
+
+# Modules whose functions are reported in profile summaries
+FOCUS_FILES = ('extract_text.py', 'skill_matcher.py', 'scoring.py', 'jd_matcher.py')
+
+
+class ProfileRun:
+    """
+    Outcome of one profiled request; profile_id stays None when profiling was skipped
+    """
+    def __init__(self):
+        self.profile_id: Optional[str] = None
+        self.hot_functions: List[Dict[str, Any]] = []
+
+
+class RequestProfiler:
+    """
+    Runs requests under cProfile, either on demand or for a random sample of
+    traffic, and keeps the .prof files for later download
+    """
+    def __init__(self, output_dir: str, sample_rate: float = 0.0, top_n: int = 20, max_files: int = 200):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self.max_files = max_files
+        # Only one cProfile profiler can be active per process
+        self._active = threading.Lock()
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @contextmanager
+    def profile(self):
+        """
+        Profile the enclosed block. If another request is already being
+        profiled the block runs unprofiled.
+        """
+        run = ProfileRun()
+        if not self._active.acquire(blocking=False):
+            yield run
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            try:
+                yield run
+            finally:
+                profiler.disable()
+            run.profile_id = self._save(profiler)
+            run.hot_functions = self.summarize(profiler)
+        finally:
+            self._active.release()
+
+    def summarize(self, profiler: cProfile.Profile) -> List[Dict[str, Any]]:
+        """
+        Hot functions from the focus modules, by cumulative time
+        """
+        stats = pstats.Stats(profiler)
+        rows = []
+        for (filename, line, function), (_cc, calls, total_time, cumulative_time, _callers) in stats.stats.items():
+            if not filename.endswith(FOCUS_FILES):
+                continue
+            rows.append({
+                'function': function,
+                'file': os.path.basename(filename),
+                'line': line,
+                'calls': calls,
+                'total_time_ms': round(total_time * 1000, 3),
+                'cumulative_time_ms': round(cumulative_time * 1000, 3)
+            })
+        rows.sort(key=lambda row: row['cumulative_time_ms'], reverse=True)
+        return rows[:self.top_n]
+
+    def _save(self, profiler: cProfile.Profile) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        profile_id = uuid.uuid4().hex
+        profiler.dump_stats(self.path_for(profile_id))
+        prune_files(self.output_dir, '.prof', self.max_files)
+        return profile_id
+
+    def path_for(self, profile_id: str) -> str:
+        return os.path.join(self.output_dir, f"{profile_id}.prof")
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+from services.storage import SqliteConnections
+
+
+def _sorted_list(value):
+    # Sets (e.g. the keywords found in a section) are stored as sorted lists
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"Cannot cache a {type(value).__name__}")
+
+
+class SectionCache:
+    """
+    Cache of per-section analysis pieces (skills, scoring features, grammar
+    findings) stored as JSON and keyed by the section's content hash under a
+    kind that names how the piece was computed, so re-uploads of an edited
+    resume only re-analyze the sections that changed. Entries live in a
+    SQLite file shared by every worker process; the oldest written entries
+    are evicted beyond max_entries.
+    """
+    def __init__(self, db_path: str, max_entries: int = 20000, evict_every: int = 100):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._connections = SqliteConnections(db_path, self._create_schema)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        return self._connections.get()
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection):
+        with conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS sections (key TEXT PRIMARY KEY, value BLOB NOT NULL)')
+
+    @staticmethod
+    def _key(kind: str, section: str) -> str:
+        return f"{kind}:{hashlib.sha1(section.encode('utf-8')).hexdigest()}"
+
+    def get(self, kind: str, section: str) -> Optional[Any]:
+        row = self._connection().execute(
+            'SELECT value FROM sections WHERE key = ?', (self._key(kind, section),)
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return json.loads(row[0]) if row else None
+
+    def put(self, kind: str, section: str, value: Any):
+        conn = self._connection()
+        with conn:
+            # REPLACE gives the entry a new rowid, so rowid order is write order
+            conn.execute('INSERT OR REPLACE INTO sections (key, value) VALUES (?, ?)',
+                         (self._key(kind, section), json.dumps(value, default=_sorted_list)))
+        with self._lock:
+            self._writes += 1
+            run_eviction = self._writes % self.evict_every == 0
+        if run_eviction:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Delete the oldest entries beyond max_entries. Returns the number deleted.
+        """
+        conn = self._connection()
+        with conn:
+            return conn.execute(
+                'DELETE FROM sections WHERE rowid <= '
+                '(SELECT rowid FROM sections ORDER BY rowid DESC LIMIT 1 OFFSET ?)',
+                (self.max_entries,)
+            ).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._connection().execute('SELECT COUNT(*) FROM sections').fetchone()[0]
+        with self._lock:
+            return {'entries': entries, 'hits': self._hits, 'misses': self._misses}
@@ -0,0 +1,49 @@
+import os
+import sqlite3
+import threading
+from typing import Callable
+
+
+class SqliteConnections:
+    """
+    SQLite connections for one database file, opened on first use in each
+    thread (sqlite3 connections are not shared between threads) and never
+    inherited across a fork: a preforking server that imports the app in its
+    master leaves nothing open for its workers. The schema callback runs once
+    per new connection.
+    """
+    def __init__(self, db_path: str, create_schema: Callable[[sqlite3.Connection], None]):
+        self.db_path = db_path
+        self._create_schema = create_schema
+        self._local = threading.local()
+        self._pid = None
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+
+    def get(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._local = threading.local()
+            self._pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._create_schema(conn)
+            self._local.conn = conn
+        return conn
+
+
+def prune_files(directory: str, suffix: str, keep: int):
+    """
+    Delete the oldest files ending in suffix from directory, keeping the
+    newest keep of them
+    """
+    files = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(suffix)),
+        key=os.path.getmtime
+    )
+    for path in files[:max(0, len(files) - keep)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -4,6 +4,7 @@ const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 export const API_ENDPOINTS = {
   HEALTH: `${API_BASE_URL}/api/health`,
   ANALYZE: `${API_BASE_URL}/api/analyze`,
+  ANALYZE_STREAM: `${API_BASE_URL}/api/analyze/stream`,
   SKILLS: `${API_BASE_URL}/api/skills`,
   JD_MATCH: `${API_BASE_URL}/api/jd-match`
 };
@@ -46,6 +47,60 @@ export const api = {
     }
   },
 
+  // Analyze CV progressively: onStage(stage, payload) is called as each
+  // Server-Sent Event arrives; resolves with the merged result
+  async analyzeCVStream(file, jdText = '', onStage = () => {}) {
+    const formData = new FormData();
+    formData.append('file', file);
+    if (jdText) {
+      formData.append('jd_text', jdText);
+    }
+
+    const response = await fetch(API_ENDPOINTS.ANALYZE_STREAM, {
+      method: 'POST',
+      body: formData,
+    });
+
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    const result = {};
+    let buffer = '';
+
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let stage = 'message';
+        let data = '';
+        rawEvent.split('\n').forEach((line) => {
+          if (line.startsWith('event: ')) stage = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        });
+        const payload = data ? JSON.parse(data) : {};
+
+        if (stage === 'error') {
+          throw new Error(payload.error || 'Analysis failed');
+        }
+        if (stage !== 'done') {
+          Object.assign(result, payload);
+        }
+        onStage(stage, payload, { ...result });
+      }
+    }
+
+    return result;
+  },
+
   // Get available skills
   async getSkills() {
     try {
@@ -3,6 +3,7 @@ import { motion } from "framer-motion";
 import { useNavigate } from "react-router-dom";
 import { useTheme } from "../contexts/ThemeContext";
 import DarkModeToggle from "../components/DarkModeToggle";
+import { api } from "../api";
 import ResumeIllustration from "../assets/2d75b10d-10aa-4a29-ad05-b285afb32d37.png";
 
 export default function Home() {
@@ -68,23 +69,40 @@ export default function Home() {
     }
     setIsUploading(true);
     setError("");
+    let navigated = false;
     try {
-      const formData = new FormData();
-      formData.append('file', file);
-      const response = await fetch('http://localhost:8000/api/analyze', {
-        method: 'POST',
-        body: formData,
+      const result = await api.analyzeCVStream(file, '', (stage, payload, partial) => {
+        // Save partial results as they arrive so the Results page can render them right away
+        localStorage.setItem('cv_analysis_result', JSON.stringify({ ...partial, _complete: stage === 'done' }));
+        window.dispatchEvent(new Event('cv_analysis_update'));
+        if (!navigated && stage === 'extraction') {
+          navigated = true;
+          navigate('/results', { state: { analysis: partial } });
+        }
       });
-      if (!response.ok) {
-        throw new Error('Failed to analyze CV');
+      if (!navigated) {
+        localStorage.setItem('cv_analysis_result', JSON.stringify({ ...result, _complete: true }));
+        navigate('/results', { state: { analysis: result } });
       }
-      const result = await response.json();
-      // Save result to localStorage for Results page
-      localStorage.setItem('cv_analysis_result', JSON.stringify(result));
-      navigate('/results', { state: { analysis: result } });
     } catch (err) {
-      setError("Failed to analyze CV. Please try again.");
       console.error('Upload error:', err);
+      if (navigated) {
+        // Home is no longer shown: record the failure on the stored result so Results can report it
+        let partial = {};
+        try {
+          partial = JSON.parse(localStorage.getItem('cv_analysis_result')) || {};
+        } catch (e) {
+          partial = {};
+        }
+        localStorage.setItem('cv_analysis_result', JSON.stringify({
+          ...partial,
+          _complete: true,
+          _error: err.message || "Analysis failed. Please try again."
+        }));
+        window.dispatchEvent(new Event('cv_analysis_update'));
+      } else {
+        setError("Failed to analyze CV. Please try again.");
+      }
     } finally {
       setIsUploading(false);
     }
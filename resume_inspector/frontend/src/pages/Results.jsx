@@ -12,16 +12,22 @@ export default function Results() {
   const { isDarkMode } = useTheme();
 
   useEffect(() => {
-    const stored = localStorage.getItem("cv_analysis_result");
-    if (stored) {
-      try {
-      setAnalysisData(JSON.parse(stored));
-      } catch (e) {
+    const loadStored = () => {
+      const stored = localStorage.getItem("cv_analysis_result");
+      if (stored) {
+        try {
+        setAnalysisData(JSON.parse(stored));
+        } catch (e) {
+          setAnalysisData(null);
+        }
+      } else {
         setAnalysisData(null);
       }
-    } else {
-      setAnalysisData(null);
-    }
+    };
+    loadStored();
+    // Streaming analysis keeps updating the stored result as stages finish
+    window.addEventListener("cv_analysis_update", loadStored);
+    return () => window.removeEventListener("cv_analysis_update", loadStored);
   }, []);
 
   if (!analysisData) {
@@ -48,6 +54,11 @@ export default function Results() {
   const fileName = analysisData.filename || analysisData.fileName || "CV";
   const analysisDate = analysisData.analysis_date || analysisData.analysisDate || "-";
   const overallScore = analysisData.scores?.overall ?? "N/A";
+  const overallScoreValue = typeof overallScore === "number" ? overallScore : 0;
+  // Streaming analysis marks the stored result incomplete until the last stage arrives
+  const isAnalysisPending = analysisData._complete === false;
+  // Set when the stream failed after the first results were shown
+  const analysisError = analysisData._error;
   const grade = analysisData.scores?.grade ?? "N/A";
   const yearsExperience = analysisData.scores?.years_experience ?? "N/A";
   const academicLevel = analysisData.scores?.academic_level ?? "N/A";
@@ -179,7 +190,7 @@ export default function Results() {
                 stroke="#4bb543"
                 strokeWidth="7"
                 strokeDasharray={2 * Math.PI * 48}
-                strokeDashoffset={2 * Math.PI * 48 * (1 - overallScore / 100)}
+                strokeDashoffset={2 * Math.PI * 48 * (1 - overallScoreValue / 100)}
                 strokeLinecap="round"
                 style={{ transition: "stroke-dashoffset 1s" }}
               />
@@ -193,8 +204,18 @@ export default function Results() {
           <div style={{ flex: 1, minWidth: 220 }}>
             <div style={{ fontWeight: 700, fontSize: 20, color: "var(--text-primary)" }}>{fileName}</div>
             <div style={{ color: "var(--text-secondary)", fontSize: 15, marginBottom: 10 }}>Analyzed on {analysisDate}</div>
+            {isAnalysisPending && (
+              <div style={{ color: "var(--accent-primary)", fontSize: 14, marginBottom: 6 }}>
+                Analysis in progress — remaining sections will appear as they finish...
+              </div>
+            )}
+            {analysisError && (
+              <div style={{ color: "#dc2626", fontSize: 14, marginBottom: 6 }}>
+                Analysis failed: {analysisError} Results below may be incomplete — please upload your CV again.
+              </div>
+            )}
             <div style={{ width: "100%", background: "var(--border-primary)", borderRadius: 8, height: 14, margin: "10px 0 8px 0" }}>
-              <div style={{ height: 14, background: "linear-gradient(90deg, var(--accent-primary), var(--accent-secondary))", borderRadius: 8, width: `${overallScore}%`, transition: "width 1s" }} />
+              <div style={{ height: 14, background: "linear-gradient(90deg, var(--accent-primary), var(--accent-secondary))", borderRadius: 8, width: `${overallScoreValue}%`, transition: "width 1s" }} />
             </div>
             <div style={{ display: "flex", gap: 24, marginTop: 12 }}>
               <div style={{ textAlign: "center" }}>